@@ -0,0 +1,130 @@
+"""
+Aggregation of source frames into the combined keyword table.
+
+Titles and URLs are streamed through the tokenize and domain stages straight
+into Counters, so no intermediate list of all titles, words or domains is
+built however many posts the sources return.
+"""
+
+import io
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from domains import iter_registrable_domains
+from tokenizer import iter_keywords
+
+def iter_domains(urls, base_url=None):
+    """Stream the registrable domains of URLs, resolving relative links against base_url"""
+    return iter_registrable_domains(urls, base_url)
+
+AGGREGATED_COLUMNS = ['keyword', 'source', 'rank', 'type']
+
+def _aggregate_section(keywords, source, ranks, content_type):
+    return pd.DataFrame({
+        'keyword': keywords.to_numpy(),
+        'source': source,
+        'rank': ranks.to_numpy(),
+        'type': content_type
+    }, columns=AGGREGATED_COLUMNS)
+
+def _counts_section(counts, n, source, content_type):
+    top = counts.most_common(n)
+    return pd.DataFrame({
+        'keyword': [value for value, _ in top],
+        'source': source,
+        'rank': pd.array([count for _, count in top], dtype='int64'),
+        'type': content_type
+    }, columns=AGGREGATED_COLUMNS)
+
+def clean_and_aggregate_data(source_frames, sources):
+    """Clean and aggregate data from all sources
+
+    source_frames maps source keys to fetched frames; sources is the list of
+    registered sources in display order.
+    """
+    sections = []
+    keyword_counts = Counter()
+    domain_counts = Counter()
+    for source in sources:
+        df = source_frames.get(source.key)
+        if df is None:
+            continue
+        if source.content_type == 'keyword':
+            # Search terms as-is, once each (multi-region sources list a term once per region)
+            df = df.drop_duplicates('keyword')
+            sections.append(_aggregate_section(df['keyword'], source.name, df['rank'], 'keyword'))
+        else:
+            # Post titles truncated to 100 characters; their words feed the extracted keywords
+            sections.append(_aggregate_section(df['keyword'].astype(str).str[:100], source.name, df['rank'], 'post_title'))
+            keyword_counts.update(iter_keywords(df['keyword']))
+        if 'url' in df.columns:
+            domain_counts.update(iter_domains(df['url'].dropna(), source.base_url))
+    
+    # Add extracted keywords
+    sections.append(_counts_section(keyword_counts, 20, 'Extracted', 'extracted_keyword'))
+    
+    # Add domains
+    sections.append(_counts_section(domain_counts, 10, 'Domains', 'domain'))
+    
+    sections = [section for section in sections if not section.empty]
+    if not sections:
+        return pd.DataFrame(columns=AGGREGATED_COLUMNS)
+    return pd.concat(sections, ignore_index=True)
+
+class OverviewIndex:
+    """An aggregated frame with source/type as categoricals and the rows of each (source, type) group precomputed
+
+    Filtered views, per-source counts and keyword frequencies are assembled
+    from the groups, so changing the filters never scans the whole frame.
+    """
+
+    def __init__(self, aggregated):
+        frame = aggregated.reset_index(drop=True)
+        # Categories in order of first appearance, which is also the order the filters offer them in
+        self.sources = list(pd.unique(frame['source']))
+        self.types = list(pd.unique(frame['type']))
+        self.frame = frame.assign(
+            source=pd.Categorical(frame['source'], categories=self.sources),
+            type=pd.Categorical(frame['type'], categories=self.types)
+        )
+        self.groups = self.frame.groupby(['source', 'type'], observed=True, sort=False).indices
+        self._keyword_counts = {}
+
+    def _selected(self, sources, types):
+        sources, types = set(sources), set(types)
+        return [group for group in self.groups if group[0] in sources and group[1] in types]
+
+    def select(self, sources, types):
+        """Rows of the chosen sources and types, in their original order"""
+        groups = self._selected(sources, types)
+        if not groups:
+            return self.frame.iloc[:0]
+        positions = np.sort(np.concatenate([self.groups[group] for group in groups]))
+        return self.frame.take(positions)
+
+    def source_counts(self, sources, types):
+        """Rows per source within the selection, largest first"""
+        counts = Counter()
+        for group in self._selected(sources, types):
+            counts[group[0]] += len(self.groups[group])
+        return pd.Series(dict(counts.most_common()), dtype='int64', name='count').rename_axis('source')
+
+    def keyword_frequencies(self, sources, types):
+        """Keyword counts over the selection; each group is tokenized at most once"""
+        frequencies = Counter()
+        for group in self._selected(sources, types):
+            if group not in self._keyword_counts:
+                self._keyword_counts[group] = Counter(iter_keywords(self.frame['keyword'].take(self.groups[group])))
+            frequencies.update(self._keyword_counts[group])
+        return frequencies
+
+    def export(self, sources, types, file_format='csv'):
+        """The selection as CSV text or Parquet bytes"""
+        view = self.select(sources, types)
+        if file_format == 'parquet':
+            buffer = io.BytesIO()
+            view.to_parquet(buffer, index=False)
+            return buffer.getvalue()
+        return view.to_csv(index=False)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+HTML parser backend benchmark.
+
+Times every available backend in html_parsing on Hacker News and Reddit
+pages and prints the parse time per page. Uses synthetic pages shaped like
+the real ones unless saved pages are passed in.
+
+Usage:
+    python -m benchmarks.bench_parsers [--hn page.html] [--reddit page.html] [--repeat 50]
+"""
+
+import argparse
+import time
+
+from html_parsing import (
+    HN_EXTRACTORS, REDDIT_EXTRACTORS, available_backends,
+    parse_hackernews_stories, parse_reddit_titles
+)
+
+
+def synthetic_hackernews_page(stories=30):
+    """A front page with the same table layout and markup density as news.ycombinator.com"""
+    rows = []
+    for i in range(stories):
+        rows.append(
+            f'<tr class="athing submission" id="{40000000 + i}">'
+            f'<td class="title"><span class="rank">{i + 1}.</span></td>'
+            f'<td class="votelinks"><center><a id="up_{i}" href="vote?id={i}&how=up"><div class="votearrow"></div></a></center></td>'
+            f'<td class="title"><span class="titleline"><a href="https://example{i % 7}.com/post/{i}">'
+            f'Show HN: Example story number {i} about something interesting</a>'
+            f'<span class="sitebit comhead"> (<a href="from?site=example{i % 7}.com"><span class="sitestr">example{i % 7}.com</span></a>)</span></span></td></tr>'
+            f'<tr><td colspan="2"></td><td class="subtext"><span class="subline">'
+            f'<span class="score" id="score_{i}">{100 + i} points</span> by <a href="user?id=user{i}" class="hnuser">user{i}</a> '
+            f'<span class="age"><a href="item?id={i}">3 hours ago</a></span> | <a href="item?id={i}">{i * 3}&nbsp;comments</a>'
+            f'</span></td></tr><tr class="spacer" style="height:5px"></tr>'
+        )
+    return ('<html lang="en"><head><title>Hacker News</title></head><body><center><table id="hnmain">'
+            '<tr><td><table>' + ''.join(rows) + '</table></td></tr></table></center></body></html>').encode()
+
+
+def synthetic_reddit_page(posts=25):
+    """A listing page padded with the nested wrapper markup Reddit serves around each post"""
+    wrapper = '<div class="_1oQyIsiPHYt6nx7VOmd1sz"><div class="_3-miAEojrCvx_4FQ8x3P-s">{}</div></div>'
+    chrome = ''.join(f'<div class="sidebar-widget-{i}"><p>Community info {i}</p><ul>' +
+                     ''.join(f'<li><a href="/r/sub{j}">r/sub{j}</a></li>' for j in range(20)) +
+                     '</ul></div>' for i in range(10))
+    posts_html = []
+    for i in range(posts):
+        inner = (
+            f'<div class="_1poyrkZ7g36PawDueRza-J"><span>Posted by u/user{i}</span>'
+            f'<a href="/r/news/comments/{i}/"><div class="_2SdHzo12ISmrC8H86TgSCp">'
+            f'<h3 class="_eYtD2XCVieq6emjKBH3m">Reddit post number {i} with a reasonably long title</h3></div></a>'
+            f'<div class="_1rZYMD_4xY3gRcSS3p8ODO">{1000 + i}</div>'
+            f'<span class="FHCV02u6Cp2zYL0fhQPsO">{i * 10} comments</span></div>'
+        )
+        posts_html.append(wrapper.format(inner))
+    return ('<!DOCTYPE html><html><head><script>window.___r = {};</script></head><body><div id="2x-container">'
+            + chrome + ''.join(posts_html) + chrome + '</div></body></html>').encode()
+
+
+def time_backend(extractor, content, repeat):
+    """Best-of-3 average milliseconds per page"""
+    best = float('inf')
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            extractor(content)
+        best = min(best, (time.perf_counter() - started) / repeat)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML parser backends")
+    parser.add_argument('--hn', help="Saved Hacker News front page")
+    parser.add_argument('--reddit', help="Saved subreddit page")
+    parser.add_argument('--repeat', type=int, default=50, help="Parses per timing run")
+    args = parser.parse_args()
+
+    pages = {
+        'Hacker News': (open(args.hn, 'rb').read() if args.hn else synthetic_hackernews_page(),
+                        HN_EXTRACTORS, parse_hackernews_stories),
+        'Reddit': (open(args.reddit, 'rb').read() if args.reddit else synthetic_reddit_page(),
+                   REDDIT_EXTRACTORS, parse_reddit_titles),
+    }
+
+    print(f"{'page':<12} {'backend':<12} {'ms/page':>9} {'speedup':>8} {'items':>6}")
+    for page_name, (content, extractors, parse) in pages.items():
+        timings = {backend: time_backend(extractors[backend], content, args.repeat)
+                   for backend in available_backends()}
+        baseline = timings['html.parser']
+        for backend, elapsed in timings.items():
+            items = len(parse(content, backend=backend))
+            print(f"{page_name:<12} {backend:<12} {elapsed:>9.3f} {baseline / elapsed:>7.1f}x {items:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+End-to-end pipeline benchmark against the offline replay server.
+
+Starts a local stand-in for Hacker News, Reddit and Google Trends (see
+replay_server), points every source at it and times each stage: fetch (cold
+and warm caches), parse, tokenize, aggregate and render. Then prints the
+scaling curve of tokenize/domains/aggregate as the number of records grows.
+
+Results can be saved with --json and compared against a saved run with
+--compare; the exit status is 1 when a stage got slower than --tolerance
+allows, so this can gate a deploy.
+
+Usage:
+    python -m benchmarks.bench_pipeline [--records 200] [--latency 0.02] [--throttle-rate 0.1]
+                                        [--sizes 100,1000,10000] [--json out.json] [--compare base.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from benchmarks.fixtures import FIXTURE_DIR, Fixtures, synthetic_titles, synthetic_urls
+from benchmarks.replay_server import ReplayServer
+
+# Differences below this many milliseconds are noise, whatever the ratio
+MIN_REGRESSION_MS = 2.0
+
+
+def best_of(function, repeat):
+    """Best wall time of `repeat` calls in milliseconds, and the last result"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+def run_stages(server, repeat):
+    """Time every pipeline stage once against the replay server; returns {stage: ms}"""
+    # Imported here so the modules read the environment pointing them at the server
+    import pandas as pd
+
+    from aggregation import clean_and_aggregate_data
+    from html_parsing import parse_hackernews_stories, parse_reddit_titles
+    from reddit_api import _loads
+    from rendering import wordcloud_png
+    from sources import registered_sources, run_sources
+    from tokenizer import iter_keywords
+
+    timings = {}
+    sources = registered_sources()
+
+    # Fetch: cold (fresh caches), then warm (HN items and unchanged pages are reused)
+    for phase in ('cold', 'warm'):
+        started = time.perf_counter()
+        frames = run_sources(sources, load=lambda source: source.run())
+        timings[f'fetch ({phase})'] = (time.perf_counter() - started) * 1000
+        for source in sources:
+            df = frames[source.key]
+            print(f"  {phase:<5} {source.name:<14} {len(df):>6} rows")
+
+    fixtures = server.fixtures
+    timings['parse hn html'], _ = best_of(lambda: parse_hackernews_stories(fixtures.hn_front_page()), repeat)
+    timings['parse reddit html'], _ = best_of(lambda: parse_reddit_titles(fixtures.reddit_page('popular')), repeat)
+    listing = fixtures.reddit_listing('popular')
+    timings['parse reddit json'], _ = best_of(lambda: _loads(listing), repeat)
+
+    titles = pd.concat([frames[source.key]['keyword'] for source in sources if source.content_type == 'post_title'],
+                       ignore_index=True)
+    timings['tokenize'], frequencies = best_of(lambda: Counter(iter_keywords(titles)), repeat)
+    timings['aggregate'], _ = best_of(lambda: clean_and_aggregate_data(frames, sources), repeat)
+    if frequencies:
+        timings['render wordcloud'], _ = best_of(lambda: wordcloud_png(frequencies), max(1, repeat // 5))
+    return timings
+
+
+def scaling_curve(sizes, repeat):
+    """Timings of the CPU-bound stages for synthetic inputs of each size; {size: {stage: ms}}"""
+    import pandas as pd
+
+    from aggregation import clean_and_aggregate_data
+    from domains import registrable_domains
+    from sources import SOURCE_REGISTRY
+    from tokenizer import iter_keywords
+
+    reddit = SOURCE_REGISTRY['reddit']
+    curve = {}
+    for size in sizes:
+        frame = pd.DataFrame({
+            'keyword': synthetic_titles(size), 'source': 'Reddit', 'rank': range(1, size + 1),
+            'url': synthetic_urls(size), 'score': 0, 'comments': 0
+        })
+        curve[size] = {
+            'tokenize': best_of(lambda: Counter(iter_keywords(frame['keyword'])), repeat)[0],
+            'domains': best_of(lambda: registrable_domains(frame['url']).value_counts(), repeat)[0],
+            'aggregate': best_of(lambda: clean_and_aggregate_data({'reddit': frame}, [reddit]), repeat)[0],
+        }
+    return curve
+
+
+def compare(results, baseline, tolerance):
+    """Stages slower than the baseline by more than `tolerance` (a fraction)"""
+    regressions = []
+    for stage, elapsed in results['stages'].items():
+        before = baseline.get('stages', {}).get(stage)
+        if before and elapsed > before * (1 + tolerance) and elapsed - before > MIN_REGRESSION_MS:
+            regressions.append((stage, before, elapsed))
+    for size, stages in results['scaling'].items():
+        for stage, elapsed in stages.items():
+            before = baseline.get('scaling', {}).get(size, {}).get(stage)
+            if before and elapsed > before * (1 + tolerance) and elapsed - before > MIN_REGRESSION_MS:
+                regressions.append((f'{stage} @ {size}', before, elapsed))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fetch/aggregate pipeline offline")
+    parser.add_argument('--records', type=int, default=200, help="Synthetic records per source listing")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument('--fixtures', default=FIXTURE_DIR, help="Directory of recorded responses")
+    parser.add_argument('--sizes', default='100,1000,10000,50000', help="Record counts for the scaling curve")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per CPU-bound stage (best is kept)")
+    parser.add_argument('--json', help="Save the results to this file")
+    parser.add_argument('--compare', help="Baseline results to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown before a stage counts as a regression")
+    args = parser.parse_args()
+
+    fixtures = Fixtures(records=args.records, directory=args.fixtures)
+    server = ReplayServer(fixtures, latency=args.latency, jitter=args.jitter, throttle_rate=args.throttle_rate)
+    with server, tempfile.TemporaryDirectory() as data_dir:
+        os.environ.update(server.source_environment())
+        os.environ['NETTRENDS_DATA_DIR'] = data_dir
+        server.point_pytrends_here()
+
+        print(f"Replay server at {server.base_url} (latency {args.latency}s, throttle rate {args.throttle_rate})")
+        stages = run_stages(server, args.repeat)
+        from trends_client import trends_client
+        trends_quota = trends_client.quota_state()
+        sizes = [int(size) for size in args.sizes.split(',') if size]
+        scaling = scaling_curve(sizes, max(1, args.repeat // 2))
+
+    print(f"\n{'stage':<20} {'ms':>10}")
+    for stage, elapsed in stages.items():
+        print(f"{stage:<20} {elapsed:>10.2f}")
+    print(f"\nrequests: {dict(server.requests)}  throttled (429): {dict(server.throttled)}")
+    print(f"google trends client: {trends_quota['state']}, {trends_quota['rate']:.2f} req/s, "
+          f"{trends_quota['throttled']} throttled responses")
+
+    print(f"\n{'records':>8} " + ' '.join(f"{stage:>12} {'us/rec':>7}" for stage in ('tokenize', 'domains', 'aggregate')))
+    for size, timings in scaling.items():
+        print(f"{size:>8} " + ' '.join(f"{timings[stage]:>10.1f}ms {timings[stage] * 1000 / size:>7.2f}"
+                                       for stage in ('tokenize', 'domains', 'aggregate')))
+
+    results = {
+        'stages': stages,
+        'scaling': {str(size): timings for size, timings in scaling.items()},
+        'requests': dict(server.requests),
+        'throttled': dict(server.throttled),
+        'trends_quota': trends_quota,
+    }
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for stage, before, after in regressions:
+                print(f"  {stage}: {before:.2f}ms -> {after:.2f}ms")
+            sys.exit(1)
+        print("\nNo regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Fixtures for the offline replay server.
+
+Responses recorded from the live sites (python -m benchmarks.fixtures
+--record) are stored in benchmarks/fixtures/ and replayed as-is. Anything not
+recorded is generated: deterministic synthetic responses shaped like the real
+ones, sized by the number of records, which is also what the scaling curve
+uses.
+
+Usage:
+    python -m benchmarks.fixtures --record [--dir benchmarks/fixtures]
+"""
+
+import argparse
+import json
+import os
+import random
+
+from benchmarks.bench_parsers import synthetic_hackernews_page, synthetic_reddit_page
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Vocabulary for synthetic titles, so tokenizing and counting see realistic repetition
+TITLE_WORDS = (
+    'ai model open source release python rust linux startup funding security breach data privacy '
+    'google apple microsoft amazon meta openai chip gpu cloud database postgres sqlite browser '
+    'climate energy battery electric space launch rocket court ruling election policy market '
+    'stocks inflation rates crypto bitcoin game engine study research paper university science'
+).split()
+FILLER_WORDS = ['the', 'of', 'and', 'for', 'with', 'new', 'how', 'why', 'is', 'in']
+DOMAINS = ['github.com', 'www.github.com', 'gist.github.com', 'nytimes.com', 'arxiv.org', 'bbc.co.uk',
+           'news.bbc.co.uk', 'techcrunch.com', 'user.github.io', 'theverge.com', 'www.reuters.com', 'medium.com']
+
+
+def synthetic_titles(count, seed=0):
+    """Deterministic post titles drawn from a fixed vocabulary with a skewed distribution"""
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(len(TITLE_WORDS))]
+    titles = []
+    for i in range(count):
+        words = rng.choices(TITLE_WORDS, weights=weights, k=rng.randint(4, 9))
+        words.insert(rng.randrange(len(words)), rng.choice(FILLER_WORDS))
+        titles.append(' '.join(words).capitalize() + f' ({i})')
+    return titles
+
+
+def synthetic_urls(count, seed=0):
+    rng = random.Random(seed + 1)
+    return [f'https://{rng.choice(DOMAINS)}/post/{i}' if rng.random() > 0.1 else f'item?id={i}' for i in range(count)]
+
+
+class Fixtures:
+    """Recorded responses where available, synthetic ones sized by `records` otherwise"""
+
+    def __init__(self, records=200, directory=FIXTURE_DIR):
+        self.records = records
+        self.directory = directory
+        self._titles = synthetic_titles(records)
+        self._urls = synthetic_urls(records)
+
+    def _recorded(self, name):
+        path = os.path.join(self.directory or '', name)
+        if self.directory and os.path.exists(path):
+            with open(path, 'rb') as f:
+                return f.read()
+        return None
+
+    def hn_front_page(self):
+        return self._recorded('hn_front_page.html') or synthetic_hackernews_page(min(self.records, 30))
+
+    def hn_story_ids(self):
+        recorded = self._recorded('hn_topstories.json')
+        if recorded:
+            return json.loads(recorded)
+        return list(range(1, self.records + 1))
+
+    def hn_item(self, item_id):
+        recorded = self._recorded('hn_items.json')
+        if recorded:
+            return json.loads(recorded).get(str(item_id))
+        if not 1 <= item_id <= self.records:
+            return None
+        i = item_id - 1
+        item = {'id': item_id, 'type': 'story', 'by': f'user{i % 97}', 'time': 1700000000 + i,
+                'title': self._titles[i], 'score': (i * 37) % 500, 'descendants': (i * 13) % 300}
+        if not self._urls[i].startswith('item?'):
+            item['url'] = self._urls[i]
+        return item
+
+    def reddit_page(self, subreddit):
+        return self._recorded(f'reddit_{subreddit}.html') or synthetic_reddit_page(min(self.records, 25))
+
+    def reddit_listing(self, subreddit, after=None, limit=100):
+        """One listing page, following the same `after` cursor scheme as Reddit"""
+        recorded = self._recorded(f'reddit_{subreddit}.json')
+        if recorded:
+            # Only one page is recorded; serve it once
+            return recorded if not after else json.dumps({'kind': 'Listing', 'data': {'children': [], 'after': None}}).encode()
+
+        start = int(after.rpartition('_')[2]) + 1 if after else 0
+        end = min(start + limit, self.records)
+        children = []
+        for i in range(start, end):
+            url = self._urls[i]
+            children.append({'kind': 't3', 'data': {
+                'name': f't3_{subreddit}_{i}', 'subreddit': subreddit, 'title': self._titles[i],
+                'score': (i * 53) % 20000, 'num_comments': (i * 7) % 900,
+                'is_self': url.startswith('item?'), 'url': url if not url.startswith('item?') else f'/r/{subreddit}/comments/{i}/'
+            }})
+        next_after = f't3_{subreddit}_{end - 1}' if end < self.records else None
+        return json.dumps({'kind': 'Listing', 'data': {'children': children, 'after': next_after}}).encode()
+
+    def trending_searches(self):
+        recorded = self._recorded('trending_searches.json')
+        if recorded:
+            return recorded
+        from trends_regions import TRENDS_REGIONS
+
+        # Each region gets its own 20 terms, overlapping with its neighbours
+        regions = {}
+        for i, region in enumerate(TRENDS_REGIONS):
+            words = TITLE_WORDS[i * 5:] + TITLE_WORDS[:i * 5]
+            regions[region] = [[word] for word in words[:20]]
+        return json.dumps(regions).encode()
+
+
+def record_fixtures(directory=FIXTURE_DIR, subreddits=('popular', 'news'), items=60):
+    """Save live responses from the three sources into `directory`"""
+    from http_client import polite_get
+
+    os.makedirs(directory, exist_ok=True)
+
+    def save(name, content):
+        with open(os.path.join(directory, name), 'wb') as f:
+            f.write(content)
+        print(f"saved {name} ({len(content)} bytes)")
+
+    save('hn_front_page.html', polite_get('https://news.ycombinator.com/').content)
+    ids = polite_get('https://hacker-news.firebaseio.com/v0/topstories.json').json()[:items]
+    save('hn_topstories.json', json.dumps(ids).encode())
+    stories = {str(item_id): polite_get(f'https://hacker-news.firebaseio.com/v0/item/{item_id}.json').json() for item_id in ids}
+    save('hn_items.json', json.dumps(stories).encode())
+    for subreddit in subreddits:
+        save(f'reddit_{subreddit}.html', polite_get(f'https://www.reddit.com/r/{subreddit}/').content)
+        save(f'reddit_{subreddit}.json', polite_get(f'https://www.reddit.com/r/{subreddit}/hot.json', params={'limit': 100, 'raw_json': 1}).content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record live responses for the replay server")
+    parser.add_argument('--record', action='store_true', help="Fetch and save live responses")
+    parser.add_argument('--dir', default=FIXTURE_DIR, help="Fixture directory")
+    args = parser.parse_args()
+    if args.record:
+        record_fixtures(args.dir)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
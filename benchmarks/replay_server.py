@@ -0,0 +1,149 @@
+"""
+Local stand-in for Hacker News, Reddit and Google Trends.
+
+ReplayServer serves the fixtures on 127.0.0.1 under one path prefix per
+site, with optional per-request latency and a fraction of requests answered
+with 429 Too Many Requests (and a Retry-After header), so fetch code can be
+timed and exercised against throttling without touching the live sites.
+
+    /hn/                          Hacker News front page
+    /hn-api/v0/...                Hacker News Firebase API
+    /reddit/r/<sub>/              subreddit HTML page
+    /reddit/r/<sub>/<listing>.json  subreddit JSON listing
+    /trends/...                   Google Trends (trending searches, cookie page)
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class ReplayServer:
+    """Threaded HTTP server replaying Fixtures, with latency and 429 injection"""
+
+    def __init__(self, fixtures, latency=0.0, jitter=0.0, throttle_rate=0.0, retry_after=1, seed=0):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.requests = Counter()  # site -> requests served
+        self.throttled = Counter()  # site -> requests answered with 429
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='replay-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def source_environment(self):
+        """Environment variables that point the NetTrends fetchers at this server"""
+        return {
+            'NETTRENDS_HN_FRONT_PAGE': f'{self.base_url}/hn/',
+            'NETTRENDS_HN_API_BASE': f'{self.base_url}/hn-api/v0',
+            'NETTRENDS_REDDIT_BASE': f'{self.base_url}/reddit',
+        }
+
+    def point_pytrends_here(self):
+        """Redirect pytrends' hard-coded Google Trends endpoints to this server"""
+        import pytrends.request as pytrends_request
+
+        base = f'{self.base_url}/trends'
+        pytrends_request.BASE_TRENDS_URL = base
+        pytrends_request.TrendReq.TRENDING_SEARCHES_URL = f'{base}/hottrends/visualize/internal/data'
+
+    def _should_throttle(self):
+        with self._lock:
+            return self.throttle_rate > 0 and self._random.random() < self.throttle_rate
+
+    def _delay(self):
+        if self.latency or self.jitter:
+            with self._lock:
+                extra = self._random.uniform(0, self.jitter) if self.jitter else 0.0
+            time.sleep(self.latency + extra)
+
+    def route(self, path, query):
+        """(status, content type, body) for a request path"""
+        fixtures = self.fixtures
+        if path == '/hn/':
+            return 200, 'text/html; charset=utf-8', fixtures.hn_front_page()
+        if path == '/hn-api/v0/topstories.json' or path == '/hn-api/v0/beststories.json':
+            return 200, 'application/json', json.dumps(fixtures.hn_story_ids()).encode()
+        if path == '/hn-api/v0/updates.json':
+            return 200, 'application/json', json.dumps({'items': [], 'profiles': []}).encode()
+        match = re.fullmatch(r'/hn-api/v0/item/(\d+)\.json', path)
+        if match:
+            return 200, 'application/json', json.dumps(fixtures.hn_item(int(match.group(1)))).encode()
+        match = re.fullmatch(r'/reddit/r/([^/]+)/([a-z]+)\.json', path)
+        if match:
+            limit = int(query.get('limit', ['25'])[0])
+            body = fixtures.reddit_listing(match.group(1), after=query.get('after', [None])[0], limit=limit)
+            return 200, 'application/json', body
+        match = re.fullmatch(r'/reddit/r/([^/]+)/', path)
+        if match:
+            return 200, 'text/html; charset=utf-8', fixtures.reddit_page(match.group(1))
+        if path == '/trends/hottrends/visualize/internal/data':
+            return 200, 'application/json', fixtures.trending_searches()
+        if path.startswith('/trends/'):
+            return 200, 'text/html; charset=utf-8', b'<html></html>'
+        return 404, 'text/plain', b'not found'
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                site = url.path.strip('/').split('/')[0]
+                with server._lock:
+                    server.requests[site] += 1
+                server._delay()
+
+                if server._should_throttle():
+                    with server._lock:
+                        server.throttled[site] += 1
+                    self._send(429, 'text/plain', b'Too Many Requests', {'Retry-After': str(server.retry_after)})
+                    return
+
+                status, content_type, body = server.route(url.path, parse_qs(url.query))
+                self._send(status, content_type, body)
+
+            def _send(self, status, content_type, body, headers=None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+NetTrends Collector
+Headless process that fetches every source on a schedule and stores the
+results in the shared disk cache, so the dashboard only has to read the
+latest snapshot. Run the dashboard with NETTRENDS_COLLECTOR_MODE=1 to make
+it read-only.
+
+Usage:
+    python collector.py              # run forever
+    python collector.py --once       # refresh every source once and exit
+"""
+
+import argparse
+import logging
+import time
+
+from aggregation import clean_and_aggregate_data
+from disk_cache import DiskCache
+from history_store import HistoryStore, snapshot_id_for
+from keyword_store import KeywordCountStore, merge_source_keywords
+from sources import REFRESH_FRACTION, registered_sources, run_sources
+
+logger = logging.getLogger('nettrends.collector')
+
+
+def due_sources(cache, sources, now=None):
+    """Sources whose cached snapshot is missing or close to expiring"""
+    now = now or time.time()
+    due = []
+    for source in sources:
+        fetched_at = cache.fetched_at(source.key)
+        if fetched_at is None or now - fetched_at >= source.ttl * REFRESH_FRACTION:
+            due.append(source)
+    return due
+
+
+def collect(cache, sources):
+    """Fetch the given sources concurrently and store their snapshots"""
+    def report(source, df, error):
+        if error:
+            logger.warning(error)
+        elif df is None:
+            logger.info(f"{source.name}: already being refreshed by another worker")
+        else:
+            logger.info(f"{source.name}: collected {len(df)} rows")
+
+    return run_sources(sources, load=lambda source: cache.refresh(source.key, source.run), on_result=report)
+
+
+def record_history(cache, history, sources):
+    """Append the aggregate of the latest snapshots of every source to the history store"""
+    frames = {}
+    fetch_times = {}
+    for source in sources:
+        entry = cache.get(source.key)
+        frames[source.key] = entry[0] if entry is not None else source.empty_frame()
+        fetch_times[source.key] = entry[1] if entry is not None else None
+    if not any(fetch_times.values()):
+        return
+
+    aggregated = clean_and_aggregate_data(frames, sources)
+    if history.append(aggregated, collected_at=max(t for t in fetch_times.values() if t),
+                      snapshot_id=snapshot_id_for(fetch_times)):
+        logger.info(f"History: stored snapshot with {len(aggregated)} rows")
+
+
+def record_keywords(cache, store, sources):
+    """Merge the titles of new source snapshots into the rolling keyword counts"""
+    for source in sources:
+        if source.content_type == 'post_title':
+            merged = merge_source_keywords(cache, store, source)
+            if merged:
+                logger.info(f"Keywords: merged {merged} new {source.name} titles")
+
+
+def compact_history(history, now=None):
+    """Merge the snapshot files of every finished day, so queries open one file per day"""
+    for day in history.compact_before(now):
+        logger.info(f"History: compacted {day}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect NetTrends source snapshots in the background")
+    parser.add_argument('--once', action='store_true', help="Refresh every source once and exit")
+    parser.add_argument('--poll', type=float, default=30, help="Seconds between schedule checks")
+    parser.add_argument('--sources', nargs='+', choices=[source.key for source in registered_sources()],
+                        help="Only collect these sources")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    all_sources = registered_sources()
+    sources = [source for source in all_sources if not args.sources or source.key in args.sources]
+    cache = DiskCache()
+    history = HistoryStore()
+    keyword_store = KeywordCountStore()
+
+    if args.once:
+        collect(cache, sources)
+        record_history(cache, history, all_sources)
+        record_keywords(cache, keyword_store, sources)
+        compact_history(history)
+        return
+
+    logger.info("Collector started for: " + ", ".join(source.name for source in sources))
+    compacted_day = None
+    while True:
+        due = due_sources(cache, sources)
+        if due:
+            collect(cache, due)
+            record_history(cache, history, all_sources)
+            record_keywords(cache, keyword_store, due)
+        # Once a day, when the previous days stop receiving snapshots
+        today = time.strftime('%Y-%m-%d', time.gmtime())
+        if today != compacted_day:
+            compact_history(history)
+            compacted_day = today
+        time.sleep(args.poll)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Persistent, host-wide cache for source fetches.
+
+Fetched DataFrames are stored in a SQLite database keyed by source and time
+window, so cached data survives restarts and is shared by every Streamlit
+worker on the host. Entries past their TTL are still served while a single
+background refresh (guarded by a lease in the database) replaces them.
+Fetches that fail or come back empty are retried with exponential backoff
+rather than on every read, and invalidated entries keep being served until
+their replacement arrives.
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+DATA_DIR = os.environ.get(
+    'NETTRENDS_DATA_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.nettrends')
+)
+
+# How long an expired entry may still be served while it is being refreshed
+MAX_STALE_SECONDS = 24 * 3600
+# How long a worker may hold the refresh lease for one entry
+LEASE_SECONDS = 120
+# Delay before retrying a failed fetch, doubling with every failure in a row
+FAILURE_BACKOFF_SECONDS = 30
+MAX_FAILURE_BACKOFF_SECONDS = 1800
+
+
+class FetchBackoff(Exception):
+    """A fetch failed recently and nothing is cached; retry_in is the number of seconds until it is retried"""
+
+    def __init__(self, message, retry_in=0.0):
+        super().__init__(message)
+        self.retry_in = retry_in
+
+
+def _backoff_error(source, retry_at):
+    retry_in = max(0.0, retry_at - time.time())
+    return FetchBackoff(f"The last {source} fetch failed; retrying in {retry_in:.0f}s", retry_in)
+
+
+def data_path(filename):
+    """Path of a file in the NetTrends data directory, creating the directory if needed"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, filename)
+
+
+class DiskCache:
+    """SQLite-backed DataFrame cache with stale-while-revalidate reads"""
+
+    def __init__(self, path=None, max_stale=MAX_STALE_SECONDS, lease_seconds=LEASE_SECONDS):
+        self.path = path or data_path('source_cache.sqlite')
+        self.max_stale = max_stale
+        self.lease_seconds = lease_seconds
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS source_cache ('
+                ' source TEXT NOT NULL, time_window TEXT NOT NULL,'
+                ' fetched_at REAL NOT NULL, payload BLOB NOT NULL,'
+                ' PRIMARY KEY (source, time_window))'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS refresh_leases ('
+                ' source TEXT NOT NULL, time_window TEXT NOT NULL,'
+                ' expires_at REAL NOT NULL,'
+                ' PRIMARY KEY (source, time_window))'
+            )
+            # Entries marked stale by invalidate, and failed fetches waiting to be retried
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS refresh_state ('
+                ' source TEXT NOT NULL, time_window TEXT NOT NULL,'
+                ' stale INTEGER NOT NULL DEFAULT 0, failures INTEGER NOT NULL DEFAULT 0,'
+                ' retry_at REAL NOT NULL DEFAULT 0,'
+                ' PRIMARY KEY (source, time_window))'
+            )
+
+    @contextmanager
+    def _connect(self):
+        # Autocommit mode; transactions are opened explicitly where needed
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def get(self, source, window='default'):
+        """Return (value, fetched_at) for an entry, or None if it is not cached"""
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT payload, fetched_at FROM source_cache WHERE source = ? AND time_window = ?',
+                (source, window)
+            ).fetchone()
+        if row is None:
+            return None
+        return pickle.loads(row[0]), row[1]
+
+    def fetched_at(self, source, window='default'):
+        """When an entry was stored, without loading its payload; None if not cached"""
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT fetched_at FROM source_cache WHERE source = ? AND time_window = ?',
+                (source, window)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def put(self, source, value, window='default', fetched_at=None):
+        """Store a value for a source and time window"""
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                'INSERT OR REPLACE INTO source_cache (source, time_window, fetched_at, payload) VALUES (?, ?, ?, ?)',
+                (source, window, fetched_at or time.time(), payload)
+            )
+            conn.execute('DELETE FROM refresh_state WHERE source = ? AND time_window = ?', (source, window))
+            conn.execute('COMMIT')
+
+    def invalidate(self, source, window=None):
+        """Mark a source's entries stale (all windows unless one is given) and clear its failure backoff
+
+        Stale entries are still served, and kept, until a refresh stores
+        their replacement; the next read starts that refresh.
+        """
+        windows = 'time_window = ?' if window is not None else '1'
+        params = (source, window) if window is not None else (source,)
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(f'UPDATE refresh_state SET failures = 0, retry_at = 0 WHERE source = ? AND {windows}', params)
+            conn.execute(
+                'INSERT INTO refresh_state (source, time_window, stale)'
+                f' SELECT source, time_window, 1 FROM source_cache WHERE source = ? AND {windows}'
+                ' ON CONFLICT (source, time_window) DO UPDATE SET stale = 1',
+                params
+            )
+            conn.execute('COMMIT')
+
+    def is_stale(self, source, window='default'):
+        """Whether an entry was invalidated and not replaced since"""
+        return self._state(source, window)[0]
+
+    def _state(self, source, window):
+        """(stale, retry_at) of an entry"""
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT stale, retry_at FROM refresh_state WHERE source = ? AND time_window = ?',
+                (source, window)
+            ).fetchone()
+        return (bool(row[0]), row[1]) if row is not None else (False, 0.0)
+
+    def _record_failure(self, source, window):
+        """Push the next attempt back exponentially with every failure in a row"""
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                'SELECT failures FROM refresh_state WHERE source = ? AND time_window = ?', (source, window)
+            ).fetchone()
+            failures = (row[0] if row is not None else 0) + 1
+            retry_at = time.time() + min(MAX_FAILURE_BACKOFF_SECONDS, FAILURE_BACKOFF_SECONDS * 2 ** (failures - 1))
+            conn.execute(
+                'INSERT INTO refresh_state (source, time_window, failures, retry_at) VALUES (?, ?, ?, ?)'
+                ' ON CONFLICT (source, time_window) DO UPDATE SET failures = excluded.failures, retry_at = excluded.retry_at',
+                (source, window, failures, retry_at)
+            )
+            conn.execute('COMMIT')
+
+    def _try_lease(self, source, window):
+        """Claim the refresh lease for an entry; False if another worker holds it"""
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                'SELECT expires_at FROM refresh_leases WHERE source = ? AND time_window = ?',
+                (source, window)
+            ).fetchone()
+            now = time.time()
+            if row is not None and row[0] > now:
+                conn.execute('ROLLBACK')
+                return False
+            conn.execute(
+                'INSERT OR REPLACE INTO refresh_leases (source, time_window, expires_at) VALUES (?, ?, ?)',
+                (source, window, now + self.lease_seconds)
+            )
+            conn.execute('COMMIT')
+            return True
+
+    def _lease_active(self, source, window):
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT expires_at FROM refresh_leases WHERE source = ? AND time_window = ?',
+                (source, window)
+            ).fetchone()
+        return row is not None and row[0] > time.time()
+
+    def _release_lease(self, source, window):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM refresh_leases WHERE source = ? AND time_window = ?', (source, window))
+
+    def _refresh(self, source, window, fetch):
+        """Run the fetch and store its result; empty results never overwrite cached data
+
+        Errors and empty results are recorded as failures, so reads back off
+        instead of fetching again right away.
+        """
+        try:
+            value = fetch()
+        except Exception:
+            self._record_failure(source, window)
+            raise
+        else:
+            if value is not None and len(value) > 0:
+                self.put(source, value, window)
+            else:
+                self._record_failure(source, window)
+            return value
+        finally:
+            self._release_lease(source, window)
+
+    def refresh(self, source, fetch, window='default'):
+        """Fetch and store an entry now, unless another worker is already refreshing it
+
+        Returns the fetched value, or None if the lease was held elsewhere.
+        """
+        if not self._try_lease(source, window):
+            return None
+        return self._refresh(source, window, fetch)
+
+    def _refresh_in_background(self, source, window, fetch):
+        if not self._try_lease(source, window):
+            return  # Someone else is already refreshing this entry
+
+        def run():
+            try:
+                self._refresh(source, window, fetch)
+            except Exception:
+                pass
+
+        threading.Thread(target=run, name=f'nettrends-refresh-{source}', daemon=True).start()
+
+    def _wait_for_refresh(self, source, window, newer_than):
+        """Poll until another worker stores a fresher entry, or the lease runs out"""
+        deadline = time.time() + self.lease_seconds
+        while time.time() < deadline:
+            time.sleep(0.5)
+            entry = self.get(source, window)
+            if entry is not None and entry[1] > newer_than:
+                return entry[0]
+            if not self._lease_active(source, window):
+                break  # The other worker finished without storing anything
+        return None
+
+    def get_or_fetch(self, source, fetch, ttl, window='default'):
+        """Serve a cached value, refreshing it according to its TTL
+
+        Fresh entries are returned directly. Expired entries younger than
+        max_stale are returned immediately while one background refresh runs.
+        Invalidated entries are refreshed right away by one worker, falling
+        back to the old value if the fetch fails. Missing (or very old)
+        entries are fetched synchronously, with only one worker on the host
+        doing the fetch while the others wait for it. After a failed fetch no
+        new one starts until its backoff has passed: the cached entry is
+        served meanwhile, or FetchBackoff raised if there is none.
+        """
+        entry = self.get(source, window)
+        stale, retry_at = self._state(source, window)
+        now = time.time()
+        backing_off = retry_at > now
+        fetched_at = 0
+        if entry is not None:
+            value, fetched_at = entry
+            age = now - fetched_at
+            if (age < ttl and not stale) or backing_off:
+                return value
+            if stale:
+                # Invalidated on purpose: fetch now, but keep serving the old value if that fails
+                if not self._try_lease(source, window):
+                    return value
+                try:
+                    fresh = self._refresh(source, window, fetch)
+                except Exception:
+                    return value
+                return fresh if fresh is not None and len(fresh) > 0 else value
+            if age < ttl + self.max_stale:
+                self._refresh_in_background(source, window, fetch)
+                return value
+        elif backing_off:
+            raise _backoff_error(source, retry_at)
+
+        if self._try_lease(source, window):
+            value = self._refresh(source, window, fetch)
+        else:
+            value = self._wait_for_refresh(source, window, fetched_at)
+            if value is None:
+                # The other worker's fetch failed; only try again once its backoff has passed
+                retry_at = self._state(source, window)[1]
+                if retry_at > time.time():
+                    if entry is not None:
+                        return entry[0]
+                    raise _backoff_error(source, retry_at)
+                value = fetch()
+
+        # Fall back to whatever we had if the fetch came back empty
+        if (value is None or len(value) == 0) and entry is not None:
+            return entry[0]
+        return value
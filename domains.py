@@ -0,0 +1,146 @@
+"""
+Registrable-domain extraction for the domain counts.
+
+Hosts are lowercased, stripped of userinfo, port and a leading "www.", and
+reduced to their registrable domain (the public suffix plus one label) using
+a bundled offline subset of the Public Suffix List, so www.github.com and
+gist.github.com both count as github.com while user.github.io stays its own
+site. Results are memoized per host, and relative links (HN's item?id=...)
+are resolved against the page they came from.
+"""
+
+import os
+import re
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+PUBLIC_SUFFIX_FILE = os.environ.get(
+    'NETTRENDS_PUBLIC_SUFFIX_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'public_suffixes.dat')
+)
+HOST_CACHE_SIZE = 65536
+
+# scheme://[userinfo@]host or protocol-relative //host
+HOST_PATTERN = re.compile(r'^(?:[a-zA-Z][a-zA-Z0-9+.-]*:)?//(?:[^@/?#]*@)?(\[[^\]]*\]|[^/:?#]*)')
+SCHEME_PATTERN = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:')
+IPV4_PATTERN = re.compile(r'^\d{1,3}(?:\.\d{1,3}){3}$')
+
+
+class PublicSuffixList:
+    """Public suffix rules with the standard wildcard and exception handling"""
+
+    def __init__(self, rules=(), wildcards=(), exceptions=()):
+        self.rules = frozenset(rules)
+        self.wildcards = frozenset(wildcards)  # "*.ck" stored as "ck"
+        self.exceptions = frozenset(exceptions)  # "!www.ck" stored as "www.ck"
+
+    @classmethod
+    def from_file(cls, path=PUBLIC_SUFFIX_FILE):
+        rules, wildcards, exceptions = set(), set(), set()
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                rule = line.strip().split()[0].lower() if line.strip() else ''
+                if not rule or rule.startswith('//'):
+                    continue
+                if rule.startswith('!'):
+                    exceptions.add(rule[1:])
+                elif rule.startswith('*.'):
+                    wildcards.add(rule[2:])
+                else:
+                    rules.add(rule)
+        return cls(rules, wildcards, exceptions)
+
+    def suffix_length(self, labels):
+        """Number of trailing labels forming the public suffix (at least 1)"""
+        for i in range(len(labels)):
+            candidate = '.'.join(labels[i:])
+            if candidate in self.exceptions:
+                return len(labels) - i - 1
+            if candidate in self.rules or '.'.join(labels[i + 1:]) in self.wildcards:
+                return len(labels) - i
+        # Unknown TLD: the default rule "*" makes the last label the suffix
+        return 1
+
+    def registrable_domain(self, host):
+        """Suffix plus one label; hosts that are themselves a suffix are returned unchanged"""
+        labels = host.split('.')
+        suffix_length = self.suffix_length(labels)
+        if suffix_length >= len(labels):
+            return host
+        return '.'.join(labels[-(suffix_length + 1):])
+
+
+public_suffixes = PublicSuffixList.from_file()
+
+
+def normalize_host(host):
+    """Lowercase a host and strip userinfo, port, trailing dot and a leading www."""
+    host = host.strip().lower().rpartition('@')[2]
+    if host.startswith('['):
+        return host.partition(']')[0] + ']'  # IPv6 literal
+    host = host.partition(':')[0].rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+    return host
+
+
+@lru_cache(maxsize=HOST_CACHE_SIZE)
+def registrable_domain(host):
+    """Registrable domain of a host, memoized per host; None for empty hosts"""
+    host = normalize_host(host)
+    if not host:
+        return None
+    if host.startswith('[') or IPV4_PATTERN.match(host) or '.' not in host:
+        return host
+    return public_suffixes.registrable_domain(host)
+
+
+def host_of(url, base_url=None):
+    """Host of a URL; relative links resolve to the host of base_url (None without one)"""
+    match = HOST_PATTERN.match(url)
+    if match:
+        return match.group(1)
+    if not url or SCHEME_PATTERN.match(url) or base_url is None:
+        # Empty links and non-hierarchical schemes (mailto:, javascript:) have no host
+        return None
+    return urlsplit(base_url).hostname
+
+
+def domain_of(url, base_url=None):
+    """Registrable domain of a URL, or None"""
+    # Missing links would otherwise become the text 'None' and resolve to base_url
+    if not isinstance(url, str) and pd.api.types.is_scalar(url) and pd.isna(url):
+        return None
+    try:
+        host = host_of(str(url).strip(), base_url)
+    except Exception:
+        return None
+    return registrable_domain(host) if host else None
+
+
+def iter_registrable_domains(urls, base_url=None):
+    """Stream the registrable domains of URLs, skipping links without one"""
+    for url in urls:
+        domain = domain_of(url, base_url)
+        if domain:
+            yield domain
+
+
+def registrable_domains(urls, base_url=None):
+    """Registrable domain of every URL in a Series (None where there is none)
+
+    Hosts are pulled out with one vectorized regex and each distinct host is
+    resolved once, so the cost is dominated by the number of unique hosts.
+    """
+    urls = pd.Series(urls, dtype=object).fillna('').astype(str).str.strip()
+    hosts = urls.str.extract(HOST_PATTERN, expand=False)
+    if base_url is not None:
+        relative = hosts.isna() & (urls != '') & ~urls.str.match(SCHEME_PATTERN)
+        hosts = hosts.mask(relative, urlsplit(base_url).hostname)
+    codes, uniques = pd.factorize(hosts)
+    # The trailing None is what code -1 (no host) picks up
+    resolved = np.array([registrable_domain(host) if host else None for host in uniques] + [None], dtype=object)
+    return pd.Series(resolved[codes], index=urls.index, dtype=object)
@@ -0,0 +1,215 @@
+"""
+Cross-source keyword canonicalization.
+
+Search terms and extracted keywords from every source are folded into
+entities: case is folded, plurals are reduced to a singular that also occurs
+among the keywords being merged ("startups" -> "startup", "movies" ->
+"movie"), spacing is ignored ("Open AI" == "OpenAI"), and
+near-duplicates such as misspellings are merged by a MinHash index over
+character n-grams. The index only compares keywords that share an LSH
+bucket, so matching stays sub-quadratic in the number of keywords.
+"""
+
+import re
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# Aggregated row types that name a keyword; titles and domains are left alone
+ENTITY_TYPES = ('keyword', 'extracted_keyword')
+
+SHINGLE_SIZE = 3
+NUM_PERMUTATIONS = 48
+LSH_BANDS = 16  # 16 bands of 3 rows: pairs above ~0.5 similarity almost always share a bucket
+SIMILARITY_THRESHOLD = 0.55
+MIN_FUZZY_LENGTH = 5  # shorter keywords only merge on an exact canonical match
+MAX_BUCKET_SIZE = 50  # buckets this crowded are too generic to say anything
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+DIGITS_PATTERN = re.compile(r'\d+')
+
+# Words ending in s that are not plurals of something else
+LEMMA_EXCEPTIONS = frozenset({
+    'news', 'series', 'species', 'physics', 'economics', 'politics', 'analytics', 'mathematics',
+    'windows', 'ios', 'macos', 'aws', 'sales', 'wales', 'texas', 'paris', 'mars', 'oasis', 'chaos',
+    'canvas', 'lens', 'pandas', 'atlas', 'alias', 'bias', 'vegas', 'christmas', 'kubernetes', 'cosmos',
+})
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def tokens(text):
+    """Casefolded words of a keyword, without possessive 's"""
+    return TOKEN_PATTERN.findall(str(text).casefold().replace("'s", ''))
+
+
+def singular_candidates(word):
+    """Singulars a plural-looking word may come from, most likely first"""
+    if len(word) <= 3 or word in LEMMA_EXCEPTIONS or not word.endswith('s') or word.endswith(('ss', 'us', 'is')):
+        return []
+    if word.endswith('ies'):
+        return [word[:-3] + 'y', word[:-1]]  # stories -> story, cookies -> cookie
+    if word.endswith('es'):
+        return [word[:-1], word[:-2]]  # caches -> cache, gases -> gas
+    return [word[:-1]]
+
+
+def lemmatize(word, vocabulary=frozenset()):
+    """A plural reduced to its singular, if that singular is in vocabulary
+
+    Suffix rules alone cannot tell "movies" (movie) from "stories" (story),
+    or "canvas" from a plural of "Canva", so a word is only reduced to a
+    form that actually occurs among the words being merged.
+    """
+    for candidate in singular_candidates(word):
+        if candidate in vocabulary:
+            return candidate
+    return word
+
+
+def canonical_form(text, vocabulary=frozenset()):
+    """Casefolded, lemmatized words of a keyword, space separated"""
+    return ' '.join(lemmatize(token, vocabulary) for token in tokens(text))
+
+
+def match_key(text, vocabulary=frozenset()):
+    """Canonical form with spacing removed, so "Open AI" and "OpenAI" collide"""
+    return canonical_form(text, vocabulary).replace(' ', '')
+
+
+def shingles(key, size=SHINGLE_SIZE):
+    padded = f'^{key}$'
+    return {padded[i:i + size] for i in range(max(1, len(padded) - size + 1))}
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+class MinHashIndex:
+    """MinHash signatures over n-gram sets with LSH banding for candidate pairs"""
+
+    def __init__(self, num_permutations=NUM_PERMUTATIONS, bands=LSH_BANDS, seed=1):
+        if num_permutations % bands:
+            raise ValueError("num_permutations must be a multiple of bands")
+        rng = np.random.default_rng(seed)
+        self.bands = bands
+        self.rows = num_permutations // bands
+        # Coefficients below 2**32 keep a * h + b (h is a 32-bit crc) inside 64 bits
+        self._a = rng.integers(1, 1 << 32, size=num_permutations, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_permutations, dtype=np.uint64)
+
+    def signature(self, shingle_set):
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingle_set), dtype=np.uint64, count=len(shingle_set))
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % np.uint64(_MERSENNE_PRIME)
+        return permuted.min(axis=1)
+
+    def candidate_pairs(self, signatures):
+        """Index pairs that share at least one band bucket, skipping over-full buckets"""
+        pairs = set()
+        for band in range(self.bands):
+            buckets = {}
+            start = band * self.rows
+            for i, signature in enumerate(signatures):
+                buckets.setdefault(signature[start:start + self.rows].tobytes(), []).append(i)
+            for members in buckets.values():
+                if 1 < len(members) <= MAX_BUCKET_SIZE:
+                    for x in range(len(members)):
+                        for y in range(x + 1, len(members)):
+                            pairs.add((members[x], members[y]))
+        return pairs
+
+
+def _looks_plural_of(word, other):
+    return word in (other + 's', other + 'es') or (other.endswith('y') and word == other[:-1] + 'ies')
+
+
+def cluster_keys(keys, threshold=SIMILARITY_THRESHOLD, index=None):
+    """Group near-duplicate match keys; returns {key: representative key}"""
+    parent = {key: key for key in keys}
+
+    def find(key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    fuzzy = [key for key in keys if len(key) >= MIN_FUZZY_LENGTH]
+    if len(fuzzy) > 1:
+        index = index or MinHashIndex()
+        shingle_sets = [shingles(key) for key in fuzzy]
+        signatures = [index.signature(s) for s in shingle_sets]
+        for i, j in index.candidate_pairs(signatures):
+            # Keys that differ in a number ("iphone 15" / "iphone 16") are different things
+            if DIGITS_PATTERN.findall(fuzzy[i]) != DIGITS_PATTERN.findall(fuzzy[j]):
+                continue
+            # Real plurals were already folded by lemmatize; a pair still left ("canva" / "canvas") is distinct
+            if _looks_plural_of(fuzzy[i], fuzzy[j]) or _looks_plural_of(fuzzy[j], fuzzy[i]):
+                continue
+            if jaccard(shingle_sets[i], shingle_sets[j]) >= threshold:
+                root_i, root_j = find(fuzzy[i]), find(fuzzy[j])
+                if root_i != root_j:
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+    return {key: find(key) for key in keys}
+
+
+def _signals(rows):
+    """Per-row strength in [0, 1] within its source: position for search terms, count for extracted keywords"""
+    rank = rows['rank'].astype(float)
+    by_source = rank.groupby(rows['source'])
+    counted = rows['type'] == 'extracted_keyword'
+    positional = 1 - (rank - 1) / by_source.transform('size')
+    relative_count = rank / by_source.transform('max')
+    return positional.where(~counted, relative_count).clip(0, 1)
+
+
+def merge_entities(aggregated, threshold=SIMILARITY_THRESHOLD):
+    """One row per entity with its variants, per-source evidence and a combined score
+
+    The combined score adds up the entity's strongest signal in each source,
+    so a keyword that several sources agree on outranks one that is only
+    strong in one of them.
+    """
+    columns = ['entity', 'score', 'sources', 'evidence', 'variants']
+    rows = aggregated[aggregated['type'].isin(ENTITY_TYPES)]
+    if rows.empty:
+        return pd.DataFrame(columns=columns)
+
+    rows = rows.assign(keyword=rows['keyword'].astype(str), source=rows['source'].astype(str))
+    rows = rows.assign(signal=_signals(rows))
+    keywords = rows['keyword'].unique()
+    # Plurals only fold into singulars that occur among these keywords
+    vocabulary = {token for keyword in keywords for token in tokens(keyword)}
+    keys = {keyword: match_key(keyword, vocabulary) for keyword in keywords}
+    keys = {keyword: key for keyword, key in keys.items() if key}
+    clusters = cluster_keys(sorted(set(keys.values())), threshold)
+    rows = rows[rows['keyword'].isin(keys)]
+    rows = rows.assign(entity_key=rows['keyword'].map(lambda keyword: clusters[keys[keyword]]))
+
+    evidence = {}  # entity key -> {source: (signal, type, rank)}, strongest row per source
+    spellings = {}  # entity key -> {keyword: [uses, is search term]}, in first-seen order
+    for row in rows.itertuples(index=False):
+        best = evidence.setdefault(row.entity_key, {})
+        if row.source not in best or row.signal > best[row.source][0]:
+            best[row.source] = (row.signal, row.type, row.rank)
+        spelling = spellings.setdefault(row.entity_key, {}).setdefault(row.keyword, [0, False])
+        spelling[0] += 1
+        spelling[1] = spelling[1] or row.type == 'keyword'
+
+    entities = []
+    for entity_key, per_source in evidence.items():
+        # Prefer the spelling used most, and a search term's casing over a lowercased token
+        variants = sorted(spellings[entity_key].items(), key=lambda item: (item[1][0], item[1][1]), reverse=True)
+        strongest = sorted(per_source.items(), key=lambda item: item[1][0], reverse=True)
+        entities.append({
+            'entity': variants[0][0],
+            'score': round(sum(signal for signal, _, _ in per_source.values()), 3),
+            'sources': len(per_source),
+            'evidence': '; '.join(
+                f"{source} {'×' if row_type == 'extracted_keyword' else '#'}{rank}"
+                for source, (_, row_type, rank) in strongest
+            ),
+            'variants': ', '.join(keyword for keyword, _ in variants),
+        })
+
+    return pd.DataFrame(entities, columns=columns).sort_values('score', ascending=False, kind='stable').reset_index(drop=True)
@@ -0,0 +1,219 @@
+"""
+Hacker News ingestion through the official Firebase API.
+
+Story id lists (topstories, beststories, ...) are fetched first, then the
+items themselves in parallel over the pooled session, a chunk at a time,
+yielding each chunk before fetching the next. Items are cached by
+id in SQLite; a cached item is only fetched again when it shows up in the
+API's updates feed or its cached copy is older than HN_ITEM_TTL, so stories
+that did not change are not re-downloaded.
+
+Stories are ranked by reciprocal-rank fusion of three signals: their place
+in the story list, their score and their comment count, so a heavily
+discussed story outranks one that is merely listed higher.
+
+Point NETTRENDS_HN_API_BASE at a local stub server to run offline.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pandas as pd
+
+from disk_cache import data_path
+from http_client import polite_get
+from pipeline import records_to_frame
+from scoring import RRF_K
+
+HN_API_BASE = os.environ.get('NETTRENDS_HN_API_BASE', 'https://hacker-news.firebaseio.com/v0').rstrip('/')
+HN_STORY_LISTS = [name.strip() for name in os.environ.get('NETTRENDS_HN_LISTS', 'topstories').split(',') if name.strip()]
+HN_MAX_STORIES = int(os.environ.get('NETTRENDS_HN_MAX_STORIES', '200'))
+HN_MAX_WORKERS = 16
+# Items are read from the cache and fetched this many at a time, so only one chunk is held in memory
+HN_FETCH_CHUNK = 4 * HN_MAX_WORKERS
+# Scores and comment counts drift even without an update event; refresh cached items after this long
+HN_ITEM_TTL = 1800
+# Cached items not fetched for this long are deleted
+HN_ITEM_RETENTION = 2 * 24 * 3600
+
+
+class ItemCache:
+    """SQLite cache of Hacker News items keyed by id"""
+
+    def __init__(self, path=None):
+        self.path = path or data_path('hn_items.sqlite')
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS hn_items ('
+                ' id INTEGER PRIMARY KEY, payload TEXT NOT NULL, fetched_at REAL NOT NULL)'
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def get_many(self, ids):
+        """Return {id: (item, fetched_at)} for the cached ones among ids"""
+        ids = list(ids)
+        found = {}
+        with self._connect() as conn:
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                for item_id, payload, fetched_at in conn.execute(
+                    f'SELECT id, payload, fetched_at FROM hn_items WHERE id IN ({placeholders})', chunk
+                ):
+                    found[item_id] = (json.loads(payload), fetched_at)
+        return found
+
+    def put_many(self, items):
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO hn_items (id, payload, fetched_at) VALUES (?, ?, ?)',
+                [(item['id'], json.dumps(item), now) for item in items]
+            )
+
+    def expire(self, max_age=HN_ITEM_RETENTION):
+        """Delete items fetched more than max_age seconds ago"""
+        with self._connect() as conn:
+            conn.execute('DELETE FROM hn_items WHERE fetched_at < ?', (time.time() - max_age,))
+
+
+_item_cache = None
+
+
+def get_item_cache():
+    """Return the process-wide item cache"""
+    global _item_cache
+    if _item_cache is None:
+        _item_cache = ItemCache()
+    return _item_cache
+
+
+def _get_json(path, limiter=None):
+    response = polite_get(f'{HN_API_BASE}/{path}', limiter=limiter)
+    response.raise_for_status()
+    return response.json()
+
+
+def fetch_story_ids(list_name, limiter=None):
+    """Ids of a story list such as 'topstories' or 'beststories', in list order"""
+    return _get_json(f'{list_name}.json', limiter) or []
+
+
+def fetch_updated_ids(limiter=None):
+    """Ids of items changed recently, from the API's updates feed (empty on failure)"""
+    try:
+        return set((_get_json('updates.json', limiter) or {}).get('items', []))
+    except Exception:
+        return set()
+
+
+def _fetch_item(item_id, limiter=None):
+    try:
+        item = _get_json(f'item/{item_id}.json', limiter)
+    except Exception:
+        return None
+    if not item or item.get('deleted') or item.get('dead'):
+        return None
+    return item
+
+
+def iter_items(ids, limiter=None, cache=None, chunk_size=HN_FETCH_CHUNK):
+    """Yield items in id order, reusing cached items that have not changed
+
+    Ids are handled `chunk_size` at a time: each chunk is read from the
+    cache, its missing or changed items are fetched in parallel, and it is
+    yielded before the next chunk is touched.
+    """
+    cache = cache or get_item_cache()
+    updated = None
+    fetched_any = False
+    with ThreadPoolExecutor(max_workers=HN_MAX_WORKERS) as executor:
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            cached = cache.get_many(chunk)
+            if cached and updated is None:
+                updated = fetch_updated_ids(limiter)
+
+            now = time.time()
+            to_fetch = [
+                item_id for item_id in chunk
+                if item_id not in cached or item_id in (updated or ()) or now - cached[item_id][1] > HN_ITEM_TTL
+            ]
+
+            items = {item_id: item for item_id, (item, _) in cached.items()}
+            if to_fetch:
+                fetched = [item for item in executor.map(lambda item_id: _fetch_item(item_id, limiter), to_fetch) if item]
+                cache.put_many(fetched)
+                items.update((item['id'], item) for item in fetched)
+                fetched_any = True
+
+            for item_id in chunk:
+                if item_id in items:
+                    yield items[item_id]
+    if fetched_any:
+        cache.expire()
+
+
+def fetch_items(ids, limiter=None, cache=None):
+    """Fetch items in parallel, reusing cached items that have not changed"""
+    return list(iter_items(ids, limiter, cache))
+
+
+def iter_stories(limiter=None, lists=None, max_stories=None, cache=None):
+    """Yield story records (title, url, score, comments) in list order"""
+    ids = []
+    seen = set()
+    for list_name in lists or HN_STORY_LISTS:
+        for item_id in fetch_story_ids(list_name, limiter):
+            if item_id not in seen:
+                seen.add(item_id)
+                ids.append(item_id)
+    ids = ids[:max_stories or HN_MAX_STORIES]
+
+    for item in iter_items(ids, limiter, cache):
+        if item.get('type') != 'story' or len(item.get('title') or '') <= 10:
+            continue
+        yield {
+            'keyword': item['title'],
+            # Text posts (Ask HN etc.) link to their discussion, like on the front page
+            'url': item.get('url') or f'item?id={item["id"]}',
+            'score': item.get('score', 0),
+            'comments': item.get('descendants', 0),
+        }
+
+
+def engagement_rank(df):
+    """1-based rank fusing list position, score and comment count (best first)"""
+    position = pd.Series(range(1, len(df) + 1), index=df.index, dtype='float64')
+    fused = (
+        1 / (RRF_K + position)
+        + 1 / (RRF_K + df['score'].rank(ascending=False, method='min'))
+        + 1 / (RRF_K + df['comments'].rank(ascending=False, method='min'))
+    )
+    # Ties keep list order
+    return fused.rank(ascending=False, method='first').astype('int64')
+
+
+def fetch_hackernews_api(limiter=None, lists=None, max_stories=None, cache=None):
+    """Fetch stories from the HN API, ranked by list position, score and comment count"""
+    df = records_to_frame(
+        iter_stories(limiter, lists, max_stories, cache),
+        ['keyword', 'url', 'score', 'comments'],
+        dtypes={'score': 'int64', 'comments': 'int64'}
+    )
+    df['source'] = 'Hacker News'
+    df['rank'] = engagement_rank(df)
+    df = df.sort_values('rank', kind='stable').reset_index(drop=True)
+    return df[['keyword', 'source', 'rank', 'url', 'score', 'comments']]
@@ -0,0 +1,195 @@
+"""
+Historical snapshots of the aggregated keyword table.
+
+Every aggregated frame is appended as one Parquet file in a date partition
+(history/date=YYYY-MM-DD/part-<snapshot>.parquet), with keyword, source and
+type dictionary-encoded. Queries go through pyarrow.dataset, so a time range
+only opens the partitions it covers and only the requested columns are read,
+with source/type/keyword filters pushed down to the Parquet reader.
+
+Finished days are compacted into one file per partition; the ids of the
+snapshots merged into it are kept in a manifest next to it, so a snapshot
+that was already stored is still recognised after compaction.
+"""
+
+import hashlib
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from disk_cache import data_path
+
+HISTORY_SCHEMA = pa.schema([
+    ('collected_at', pa.timestamp('s', tz='UTC')),
+    ('keyword', pa.dictionary(pa.int32(), pa.string())),
+    ('source', pa.dictionary(pa.int32(), pa.string())),
+    ('type', pa.dictionary(pa.int32(), pa.string())),
+    ('rank', pa.int64()),
+])
+
+PARTITIONING = ds.partitioning(pa.schema([('date', pa.string())]), flavor='hive')
+# Ids of the snapshots merged into a compacted partition; the leading _ keeps pyarrow from reading it as data
+MANIFEST_NAME = '_snapshots.txt'
+COMPACTED_NAME = 'part-compacted.parquet'
+
+
+def snapshot_id_for(fetch_times):
+    """Stable id for the combination of source fetch times behind an aggregated frame"""
+    signature = '|'.join(f'{source}:{fetched_at}' for source, fetched_at in sorted(fetch_times.items()))
+    return hashlib.sha1(signature.encode('utf-8')).hexdigest()[:16]
+
+
+def _day(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+class HistoryStore:
+    """Date-partitioned Parquet store of aggregated snapshots"""
+
+    def __init__(self, root=None):
+        self.root = root or data_path('history')
+        os.makedirs(self.root, exist_ok=True)
+
+    def _snapshot_path(self, snapshot_id, collected_at):
+        return os.path.join(self.root, f'date={_day(collected_at)}', f'part-{snapshot_id}.parquet')
+
+    def _manifest(self, partition):
+        try:
+            with open(os.path.join(partition, MANIFEST_NAME), encoding='utf-8') as f:
+                return set(f.read().split())
+        except FileNotFoundError:
+            return set()
+
+    def has_snapshot(self, snapshot_id, collected_at):
+        """Whether a snapshot is stored, on its own or merged into its day's compacted file"""
+        path = self._snapshot_path(snapshot_id, collected_at)
+        return os.path.exists(path) or snapshot_id in self._manifest(os.path.dirname(path))
+
+    def append(self, aggregated, collected_at=None, snapshot_id=None):
+        """Append an aggregated frame; returns False if this snapshot was already stored
+
+        snapshot_id names the file, so appending the same snapshot twice (for
+        example from two workers) overwrites instead of duplicating it.
+        """
+        collected_at = collected_at or time.time()
+        snapshot_id = snapshot_id or f'{int(collected_at * 1000)}'
+        path = self._snapshot_path(snapshot_id, collected_at)
+        if aggregated.empty or self.has_snapshot(snapshot_id, collected_at):
+            return False
+
+        frame = pd.DataFrame({
+            'collected_at': pd.Timestamp(int(collected_at), unit='s', tz='UTC'),
+            'keyword': aggregated['keyword'].astype(str).astype('category'),
+            'source': aggregated['source'].astype(str).astype('category'),
+            'type': aggregated['type'].astype(str).astype('category'),
+            'rank': aggregated['rank'].astype('int64'),
+        })
+        table = pa.Table.from_pandas(frame, schema=HISTORY_SCHEMA, preserve_index=False)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        pq.write_table(table, temp_path, use_dictionary=['keyword', 'source', 'type'], compression='zstd')
+        os.replace(temp_path, path)
+        return True
+
+    def query(self, start=None, end=None, columns=None, sources=None, types=None, keywords=None):
+        """Load snapshots collected between start and end (datetimes, UTC)
+
+        Only partitions overlapping the range are opened, only `columns` are
+        read, and the optional source/type/keyword filters are pushed down.
+        """
+        end = end or datetime.now(timezone.utc)
+        start = start or end - timedelta(days=7)
+        columns = columns or ['collected_at', 'keyword', 'source', 'type', 'rank']
+
+        dataset = ds.dataset(
+            self.root, format='parquet', partitioning=PARTITIONING,
+            schema=HISTORY_SCHEMA.append(pa.field('date', pa.string())),
+            exclude_invalid_files=True
+        )
+        condition = (
+            (ds.field('date') >= start.strftime('%Y-%m-%d')) &
+            (ds.field('date') <= end.strftime('%Y-%m-%d')) &
+            (ds.field('collected_at') >= pa.scalar(start, pa.timestamp('s', tz='UTC'))) &
+            (ds.field('collected_at') <= pa.scalar(end, pa.timestamp('s', tz='UTC')))
+        )
+        if sources:
+            condition &= ds.field('source').isin(list(sources))
+        if types:
+            condition &= ds.field('type').isin(list(types))
+        if keywords:
+            condition &= ds.field('keyword').isin(list(keywords))
+
+        return dataset.to_table(columns=columns, filter=condition).to_pandas()
+
+    def compact(self, day):
+        """Merge the snapshot files of a past day (YYYY-MM-DD) into a single file
+
+        The ids of the merged snapshots are added to the partition's
+        manifest before any file is replaced, so has_snapshot() keeps
+        recognising them.
+        """
+        partition = os.path.join(self.root, f'date={day}')
+        files = sorted(f for f in os.listdir(partition) if f.endswith('.parquet'))
+        if len(files) < 2:
+            return
+        table = pa.concat_tables(pq.read_table(os.path.join(partition, f), schema=HISTORY_SCHEMA) for f in files)
+
+        merged_ids = self._manifest(partition) | {
+            f[len('part-'):-len('.parquet')] for f in files if f != COMPACTED_NAME
+        }
+        temp_manifest = os.path.join(partition, f'{MANIFEST_NAME}.{os.getpid()}.tmp')
+        with open(temp_manifest, 'w', encoding='utf-8') as f:
+            f.write(''.join(f'{snapshot_id}\n' for snapshot_id in sorted(merged_ids)))
+        os.replace(temp_manifest, os.path.join(partition, MANIFEST_NAME))
+
+        temp_path = os.path.join(partition, f'compacted.{os.getpid()}.tmp')
+        pq.write_table(table, temp_path, use_dictionary=['keyword', 'source', 'type'], compression='zstd')
+        os.replace(temp_path, os.path.join(partition, COMPACTED_NAME))
+        for f in files:
+            if f != COMPACTED_NAME:
+                os.remove(os.path.join(partition, f))
+
+    def compact_before(self, now=None):
+        """Compact every day partition before the (UTC) day of `now`; returns the days compacted"""
+        day = _day(now or time.time())
+        compacted = []
+        for name in sorted(os.listdir(self.root)):
+            if name.startswith('date=') and name[len('date='):] < day:
+                partition_day = name[len('date='):]
+                files = [f for f in os.listdir(os.path.join(self.root, name)) if f.endswith('.parquet')]
+                if len(files) > 1:
+                    self.compact(partition_day)
+                    compacted.append(partition_day)
+        return compacted
+
+
+def daily_keyword_counts(history, keywords):
+    """Mentions per day for extracted keywords, one column per keyword
+
+    For extracted keywords rank is the mention count in that snapshot; each
+    day uses the average over its snapshots so collection frequency does not
+    inflate the numbers.
+    """
+    if history.empty:
+        return pd.DataFrame(columns=list(keywords))
+    history = history.assign(day=history['collected_at'].dt.floor('D'), keyword=history['keyword'].astype(str))
+    totals = history.groupby(['day', 'keyword'])['rank'].sum()
+    daily = totals.div(history.groupby('day')['collected_at'].nunique(), level='day')
+    return daily.unstack('keyword').reindex(columns=list(keywords)).fillna(0)
+
+
+def week_over_week(daily, now=None):
+    """Mentions in the last 7 days versus the 7 days before, per keyword"""
+    now = pd.Timestamp(now or time.time(), unit='s', tz='UTC').floor('D')
+    this_week = daily[daily.index > now - pd.Timedelta(days=7)].sum()
+    last_week = daily[(daily.index <= now - pd.Timedelta(days=7)) & (daily.index > now - pd.Timedelta(days=14))].sum()
+    table = pd.DataFrame({'this_week': this_week, 'last_week': last_week})
+    table['change_pct'] = ((table['this_week'] - table['last_week']) / table['last_week'].where(table['last_week'] > 0) * 100).round(1)
+    table = table.sort_values('this_week', ascending=False)
+    return table.rename_axis('keyword').reset_index()
@@ -0,0 +1,170 @@
+"""
+HTML extractors for the Hacker News and Reddit scrapers.
+
+Each extractor has several parser backends, tried from fastest to slowest:
+
+- selectolax: lexbor-based CSS selection (optional dependency)
+- lxml: libxml2 parse plus an XPath query for just the nodes we need
+- strainer: BeautifulSoup limited by a SoupStrainer, so only the target tags are built
+- html.parser: the original full BeautifulSoup tree, kept as the fallback
+
+Set NETTRENDS_HTML_PARSER to force a backend.
+"""
+
+import os
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+REDDIT_TITLE_CLASS = '_eYtD2XCVieq6emjKBH3m'
+REDDIT_TITLES_PER_PAGE = 10
+
+# Fastest first; backends whose library is missing are skipped
+BACKEND_PREFERENCE = ['selectolax', 'lxml', 'strainer', 'html.parser']
+
+
+def available_backends():
+    """Backends usable in this environment, fastest first"""
+    backends = []
+    for backend in BACKEND_PREFERENCE:
+        if backend == 'selectolax' and HTMLParser is None:
+            continue
+        if backend == 'lxml' and lxml is None:
+            continue
+        backends.append(backend)
+    return backends
+
+
+def default_backend():
+    """The configured backend, or the fastest available one"""
+    configured = os.environ.get('NETTRENDS_HTML_PARSER')
+    if configured in available_backends():
+        return configured
+    return available_backends()[0]
+
+
+def _strainer_features():
+    return 'lxml' if lxml is not None else 'html.parser'
+
+
+def _xpath_class(class_name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+def _text(strings):
+    # Same as BeautifulSoup's get_text(strip=True)
+    return ''.join(s.strip() for s in strings if s.strip())
+
+
+# Hacker News
+
+def _hn_selectolax(content):
+    stories = []
+    for span in HTMLParser(content).css('span.titleline'):
+        a_tag = span.css_first('a')
+        if a_tag is not None:
+            stories.append((a_tag.text(deep=True, strip=True), a_tag.attributes.get('href') or ''))
+    return stories
+
+
+def _hn_lxml(content):
+    stories = []
+    for span in lxml.html.fromstring(content).xpath(f"//span[{_xpath_class('titleline')}]"):
+        a_tag = span.find('.//a')
+        if a_tag is not None:
+            stories.append((_text(a_tag.itertext()), a_tag.get('href', '')))
+    return stories
+
+
+def _hn_soup(soup):
+    stories = []
+    for link in soup.find_all('span', class_='titleline'):
+        a_tag = link.find('a')
+        if a_tag:
+            stories.append((a_tag.get_text(strip=True), a_tag.get('href', '')))
+    return stories
+
+
+def _hn_strainer(content):
+    strainer = SoupStrainer('span', class_='titleline')
+    return _hn_soup(BeautifulSoup(content, _strainer_features(), parse_only=strainer))
+
+
+def _hn_html_parser(content):
+    return _hn_soup(BeautifulSoup(content, 'html.parser'))
+
+
+# Reddit
+
+def _reddit_selectolax(content):
+    tree = HTMLParser(content)
+    titles = tree.css(f'h3.{REDDIT_TITLE_CLASS}') or tree.css('h3')
+    return [title.text(deep=True, strip=True) for title in titles[:REDDIT_TITLES_PER_PAGE]]
+
+
+def _reddit_lxml(content):
+    tree = lxml.html.fromstring(content)
+    titles = tree.xpath(f"//h3[{_xpath_class(REDDIT_TITLE_CLASS)}]") or tree.xpath('//h3')
+    return [_text(title.itertext()) for title in titles[:REDDIT_TITLES_PER_PAGE]]
+
+
+def _reddit_soup(soup):
+    titles = soup.find_all('h3', class_=REDDIT_TITLE_CLASS)
+    if not titles:
+        titles = soup.find_all('h3')
+    return [title.get_text(strip=True) for title in titles[:REDDIT_TITLES_PER_PAGE]]
+
+
+def _reddit_strainer(content):
+    return _reddit_soup(BeautifulSoup(content, _strainer_features(), parse_only=SoupStrainer('h3')))
+
+
+def _reddit_html_parser(content):
+    return _reddit_soup(BeautifulSoup(content, 'html.parser'))
+
+
+HN_EXTRACTORS = {
+    'selectolax': _hn_selectolax,
+    'lxml': _hn_lxml,
+    'strainer': _hn_strainer,
+    'html.parser': _hn_html_parser,
+}
+
+REDDIT_EXTRACTORS = {
+    'selectolax': _reddit_selectolax,
+    'lxml': _reddit_lxml,
+    'strainer': _reddit_strainer,
+    'html.parser': _reddit_html_parser,
+}
+
+
+def _extract(extractors, content, backend):
+    backend = backend or default_backend()
+    try:
+        return extractors[backend](content)
+    except Exception:
+        if backend == 'html.parser':
+            raise
+        # Fall back to the slow but forgiving full parse
+        return extractors['html.parser'](content)
+
+
+def parse_hackernews_stories(content, backend=None):
+    """Extract (title, url) pairs from the Hacker News front page"""
+    stories = _extract(HN_EXTRACTORS, content, backend)
+    return [(title, url) for title, url in stories if title and len(title) > 10]
+
+
+def parse_reddit_titles(content, backend=None):
+    """Extract post titles from a subreddit page"""
+    titles = _extract(REDDIT_EXTRACTORS, content, backend)
+    return [text for text in titles if text and len(text) > 10]  # Filter out short/empty titles
@@ -0,0 +1,86 @@
+"""
+Shared HTTP transport for the NetTrends scrapers.
+
+All scrapers go through one pooled requests.Session so connections (and TLS
+sessions) are reused, and through one token bucket so the overall request
+rate stays polite no matter how many fetches run in parallel.
+"""
+
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Politeness settings, overridable from the environment
+REQUESTS_PER_SECOND = float(os.environ.get('NETTRENDS_REQUESTS_PER_SECOND', '4'))
+REQUEST_BURST = int(os.environ.get('NETTRENDS_REQUEST_BURST', '4'))
+POOL_SIZE = int(os.environ.get('NETTRENDS_POOL_SIZE', '16'))
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens=1):
+        """Take tokens if they are available right now, without waiting"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens=1):
+        """Block until the requested number of tokens is available"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait_time = (tokens - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+
+# Global limiter shared by every scraper
+politeness_limiter = TokenBucket(REQUESTS_PER_SECOND, REQUEST_BURST)
+
+
+def get_session():
+    """Return the process-wide pooled session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers.update({'User-Agent': USER_AGENT})
+                _session = session
+    return _session
+
+
+def polite_get(url, limiter=None, **kwargs):
+    """GET a URL through the shared session once the rate limiter allows it"""
+    (limiter or politeness_limiter).acquire()
+    kwargs.setdefault('timeout', 10)
+    return get_session().get(url, **kwargs)
@@ -0,0 +1,211 @@
+"""
+Rolling, time-bucketed keyword counts.
+
+Each fetch is merged as a delta: only titles not seen before are tokenized,
+and their keyword counts are added to the bucket for the current hour (or
+whatever bucket size is configured). Queries over the last X hours read just
+the buckets in that window, and buckets older than the retention period are
+expired, so the cost of a query does not grow with the amount of history.
+
+Each source snapshot is merged once, keyed by its fetch time, so readers that
+see the same snapshot again skip it with one read instead of re-hashing its
+titles under the write lock. Expiry runs once per bucket.
+"""
+
+import hashlib
+import sqlite3
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import pandas as pd
+
+from disk_cache import data_path
+from tokenizer import default_tokenizer
+
+BUCKET_SECONDS = 3600
+# Two weeks, so a 7-day rising window still has the 7 days before it to compare with
+RETENTION_SECONDS = 14 * 24 * 3600
+
+
+class KeywordCountStore:
+    """SQLite-backed keyword counts per source and time bucket"""
+
+    def __init__(self, path=None, bucket_seconds=BUCKET_SECONDS, retention_seconds=RETENTION_SECONDS, tokenizer=None):
+        self.path = path or data_path('keyword_counts.sqlite')
+        self.bucket_seconds = bucket_seconds
+        self.retention_seconds = retention_seconds
+        self.tokenizer = tokenizer or default_tokenizer
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS keyword_counts ('
+                ' bucket INTEGER NOT NULL, source TEXT NOT NULL, keyword TEXT NOT NULL,'
+                ' count INTEGER NOT NULL,'
+                ' PRIMARY KEY (bucket, source, keyword))'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS seen_items ('
+                ' item_hash TEXT PRIMARY KEY, bucket INTEGER NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS seen_items_bucket ON seen_items (bucket)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS merged_snapshots ('
+                ' source TEXT NOT NULL, fetched_at REAL NOT NULL,'
+                ' PRIMARY KEY (source, fetched_at))'
+            )
+        self._merged = set()  # (source, fetched_at) known to be merged, so repeat checks skip SQLite
+        self._expired_bucket = None
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def bucket_of(self, timestamp):
+        """Start of the bucket a timestamp falls into"""
+        return int(timestamp // self.bucket_seconds) * self.bucket_seconds
+
+    @staticmethod
+    def _item_hash(source, text):
+        return hashlib.sha1(f'{source}\x00{text}'.encode('utf-8')).hexdigest()
+
+    def has_merged(self, source, fetched_at):
+        """Whether the snapshot of source fetched at fetched_at was merged already"""
+        if (source, fetched_at) in self._merged:
+            return True
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT 1 FROM merged_snapshots WHERE source = ? AND fetched_at = ?', (source, fetched_at)
+            ).fetchone()
+        if row is not None:
+            self._merged.add((source, fetched_at))
+        return row is not None
+
+    def merge_snapshot(self, source, titles, fetched_at):
+        """Merge the titles of one source snapshot, once; returns the number of new titles merged"""
+        if self.has_merged(source, fetched_at):
+            return 0
+        return self.merge_titles(source, titles, now=fetched_at, fetched_at=fetched_at)
+
+    def merge_titles(self, source, titles, now=None, fetched_at=None):
+        """Count keywords of titles not seen before into the current bucket
+
+        With fetched_at, the snapshot is also recorded as merged (see
+        merge_snapshot). Returns the number of new titles merged.
+        """
+        now = now or time.time()
+        bucket = self.bucket_of(now)
+        titles = [str(title) for title in titles]
+        hashes = {self._item_hash(source, title): title for title in titles}
+        if not hashes and fetched_at is None:
+            return 0
+
+        new_items = {}
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if fetched_at is not None:
+                    cursor = conn.execute(
+                        'INSERT OR IGNORE INTO merged_snapshots (source, fetched_at) VALUES (?, ?)', (source, fetched_at)
+                    )
+                    if cursor.rowcount == 0:
+                        # Another worker merged this snapshot first
+                        conn.execute('ROLLBACK')
+                        self._merged.add((source, fetched_at))
+                        return 0
+                seen = set()
+                hash_list = list(hashes)
+                for i in range(0, len(hash_list), 500):
+                    chunk = hash_list[i:i + 500]
+                    placeholders = ','.join('?' * len(chunk))
+                    seen.update(row[0] for row in conn.execute(
+                        f'SELECT item_hash FROM seen_items WHERE item_hash IN ({placeholders})', chunk
+                    ))
+                new_items = {h: title for h, title in hashes.items() if h not in seen}
+                if new_items:
+                    counts = Counter(self.tokenizer.iter_tokens(new_items.values()))
+                    conn.executemany(
+                        'INSERT INTO keyword_counts (bucket, source, keyword, count) VALUES (?, ?, ?, ?)'
+                        ' ON CONFLICT (bucket, source, keyword) DO UPDATE SET count = count + excluded.count',
+                        [(bucket, source, keyword, count) for keyword, count in counts.items()]
+                    )
+                    conn.executemany(
+                        'INSERT OR IGNORE INTO seen_items (item_hash, bucket) VALUES (?, ?)',
+                        [(h, bucket) for h in new_items]
+                    )
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        if fetched_at is not None:
+            self._merged.add((source, fetched_at))
+        # Expire once per bucket, since nothing new falls out of retention in between
+        if self._expired_bucket != self.bucket_of(time.time()):
+            self.expire()
+        return len(new_items)
+
+    def expire(self, now=None):
+        """Drop buckets older than the retention period"""
+        now = now or time.time()
+        cutoff = self.bucket_of(now - self.retention_seconds)
+        with self._connect() as conn:
+            conn.execute('DELETE FROM keyword_counts WHERE bucket < ?', (cutoff,))
+            conn.execute('DELETE FROM seen_items WHERE bucket < ?', (cutoff,))
+            conn.execute('DELETE FROM merged_snapshots WHERE fetched_at < ?', (cutoff,))
+        self._expired_bucket = self.bucket_of(now)
+        self._merged = {key for key in self._merged if key[1] >= cutoff}
+
+    def _window_counts(self, conn, start, end, source):
+        query = 'SELECT keyword, SUM(count) FROM keyword_counts WHERE bucket >= ? AND bucket < ?'
+        params = [start, end]
+        if source is not None:
+            query += ' AND source = ?'
+            params.append(source)
+        query += ' GROUP BY keyword'
+        return dict(conn.execute(query, params).fetchall())
+
+    def top(self, n=20, hours=24, source=None, now=None):
+        """Most mentioned keywords over the last `hours`"""
+        end = self.bucket_of(now or time.time()) + self.bucket_seconds
+        start = end - int(hours * 3600)
+        with self._connect() as conn:
+            counts = self._window_counts(conn, start, end, source)
+        top = Counter(counts).most_common(n)
+        return pd.DataFrame(top, columns=['keyword', 'count'])
+
+    def rising(self, n=20, hours=1, source=None, now=None):
+        """Keywords whose mentions grew most versus the window before, with velocity per hour
+
+        `hours` is capped at half the retention period, since the window
+        before it must still be stored.
+        """
+        hours = min(hours, self.retention_seconds / 2 / 3600)
+        end = self.bucket_of(now or time.time()) + self.bucket_seconds
+        window = int(hours * 3600)
+        with self._connect() as conn:
+            recent = self._window_counts(conn, end - window, end, source)
+            previous = self._window_counts(conn, end - 2 * window, end - window, source)
+
+        rows = []
+        for keyword, count in recent.items():
+            before = previous.get(keyword, 0)
+            if count > before:
+                rows.append((keyword, count, before, (count - before) / hours))
+        rows.sort(key=lambda row: row[3], reverse=True)
+        return pd.DataFrame(rows[:n], columns=['keyword', 'recent', 'previous', 'velocity'])
+
+
+def merge_source_keywords(cache, store, source):
+    """Merge the titles of a source's cached snapshot into the counts, unless that snapshot was merged already"""
+    fetched_at = cache.fetched_at(source.key)
+    if fetched_at is None or store.has_merged(source.name, fetched_at):
+        return 0
+    entry = cache.get(source.key)
+    if entry is None:
+        return 0
+    df, fetched_at = entry
+    return store.merge_snapshot(source.name, df['keyword'] if 'keyword' in df.columns else [], fetched_at)
@@ -1,14 +1,26 @@
 import streamlit as st
 import pandas as pd
-from pytrends.request import TrendReq
-import requests
-from bs4 import BeautifulSoup
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
-import re
+import hashlib
+import logging
+import os
 import time
 from collections import Counter
-from urllib.parse import urlparse
+from datetime import datetime, timedelta, timezone
+from aggregation import OverviewIndex, clean_and_aggregate_data
+from disk_cache import DiskCache
+from domains import registrable_domains
+from entities import merge_entities
+from history_store import HistoryStore, daily_keyword_counts, snapshot_id_for, week_over_week
+from keyword_store import KeywordCountStore, merge_source_keywords
+from rendering import wordcloud_png
+from scoring import TrendScores
+from sources import HN_FRONT_PAGE, registered_sources, run_sources
+from tokenizer import iter_keywords
+from trend_lookup import lookup_keyword_comparison, lookup_keyword_trend, payloads_needed
+from trends_client import TrendsUnavailable, trends_client
+from trends_regions import TRENDS_REGIONS, region_label
+
+logger = logging.getLogger(__name__)
 
 # Initialize the Streamlit app
 st.set_page_config(
@@ -53,285 +65,199 @@ st.markdown("""
 st.markdown('<h1 class="main-header">🌐 NetTrends Dashboard</h1>', unsafe_allow_html=True)
 st.markdown("**Discover trending keywords and domains from Google Trends, Reddit, and Hacker News**")
 
-# Data fetching functions with error handling and caching
+# Cached source loading
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def fetch_google_trends():
-    """Fetch trending searches from Google Trends using actual API"""
-    try:
-        # Create pytrends object with minimal configuration to avoid errors
-        pytrends = TrendReq(hl='en-US', tz=360)
-        
-        # Method 1: Try trending searches for different countries
-        country_codes = ['united_states', 'p1', 'p4', 'p6']  # US, World, UK, Canada
-        
-        for country in country_codes:
-            try:
-                if country == 'united_states':
-                    trending_searches = pytrends.trending_searches(pn=country)
-                else:
-                    trending_searches = pytrends.trending_searches(pn=country)
-                
-                if trending_searches is not None and not trending_searches.empty:
-                    # Extract the first column which contains the trending terms
-                    if len(trending_searches.columns) > 0:
-                        keywords = trending_searches.iloc[:, 0].dropna().tolist()
-                        if keywords:
-                            df = pd.DataFrame(keywords, columns=['keyword'])
-                            df['source'] = f'Google Trends ({country.replace("_", " ").title()})'
-                            df['rank'] = range(1, len(df) + 1)
-                            return df
-            except Exception as country_error:
-                continue
-        
-        # Method 2: Try without country parameter
-        try:
-            trending_searches = pytrends.trending_searches()
-            if trending_searches is not None and not trending_searches.empty:
-                keywords = trending_searches.iloc[:, 0].dropna().tolist()
-                if keywords:
-                    df = pd.DataFrame(keywords, columns=['keyword'])
-                    df['source'] = 'Google Trends (Global)'
-                    df['rank'] = range(1, len(df) + 1)
-                    return df
-        except Exception as global_error:
-            pass
-        
-        # Method 3: Get trending keywords using interest over time for popular terms
-        try:
-            # Use a set of popular keywords to get current trending data
-            popular_keywords = [
-                'AI', 'Bitcoin', 'Tesla', 'iPhone', 'Netflix', 'Amazon', 'Google',
-                'Facebook', 'Twitter', 'TikTok', 'YouTube', 'Instagram', 'WhatsApp',
-                'COVID', 'Ukraine', 'Climate', 'NFT', 'Crypto', 'Stock', 'Weather'
-            ]
-            
-            # Get interest data for these keywords
-            trending_data = []
-            for keyword in popular_keywords[:10]:  # Limit to avoid rate limiting
-                try:
-                    pytrends.build_payload([keyword], cat=0, timeframe='now 1-d')
-                    interest = pytrends.interest_over_time()
-                    if not interest.empty and keyword in interest.columns:
-                        avg_interest = interest[keyword].mean()
-                        if avg_interest > 0:
-                            trending_data.append({'keyword': keyword, 'interest': avg_interest})
-                    time.sleep(0.1)  # Small delay to avoid rate limiting
-                except:
-                    continue
-            
-            if trending_data:
-                # Sort by interest level
-                trending_df = pd.DataFrame(trending_data)
-                trending_df = trending_df.sort_values('interest', ascending=False)
-                df = pd.DataFrame(trending_df['keyword'].tolist(), columns=['keyword'])
-                df['source'] = 'Google Trends (Current Interest)'
-                df['rank'] = range(1, len(df) + 1)
-                return df
-        except Exception as interest_error:
-            pass
-        
-        # If all methods fail, return empty DataFrame
-        st.error("Unable to fetch Google Trends data. This may be due to API rate limiting or connectivity issues.")
-        return pd.DataFrame(columns=['keyword', 'source', 'rank'])
-        
-    except Exception as e:
-        st.error(f"Error connecting to Google Trends: {str(e)}")
-        return pd.DataFrame(columns=['keyword', 'source', 'rank'])
+# When a collector (collector.py) keeps the cache warm, the dashboard never fetches itself
+COLLECTOR_MODE = os.environ.get('NETTRENDS_COLLECTOR_MODE') == '1'
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def fetch_reddit_trends():
-    """Fetch trending posts from Reddit's front page"""
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        # Try multiple subreddits for better data
-        subreddits = ['popular', 'all', 'news', 'technology']
-        all_titles = []
-        
-        for subreddit in subreddits:
-            try:
-                url = f'https://www.reddit.com/r/{subreddit}/'
-                response = requests.get(url, headers=headers, timeout=10)
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Try different selectors for post titles
-                titles = soup.find_all('h3', class_='_eYtD2XCVieq6emjKBH3m')
-                if not titles:
-                    titles = soup.find_all('h3')
-                
-                for title in titles[:10]:  # Limit to 10 per subreddit
-                    text = title.get_text(strip=True)
-                    if text and len(text) > 10:  # Filter out short/empty titles
-                        all_titles.append(text)
-                        
-                time.sleep(0.5)  # Be respectful with requests
-            except Exception as e:
-                continue
-        
-        df = pd.DataFrame(all_titles[:30], columns=['keyword'])  # Top 30 posts
-        df['source'] = 'Reddit'
-        df['rank'] = range(1, len(df) + 1)
-        return df
-    except Exception as e:
-        st.error(f"Error fetching Reddit data: {str(e)}")
-        return pd.DataFrame(columns=['keyword', 'source', 'rank'])
+@st.cache_resource
+def get_source_cache():
+    """Disk cache shared by every session, every worker on this host and the collector"""
+    return DiskCache()
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def fetch_hackernews_trends():
-    """Fetch trending stories from Hacker News front page"""
-    try:
-        url = 'https://news.ycombinator.com/'
-        response = requests.get(url, timeout=10)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Find story titles and URLs
-        titles = []
-        urls = []
-        
-        # Look for story links
-        story_links = soup.find_all('span', class_='titleline')
-        for link in story_links:
-            a_tag = link.find('a')
-            if a_tag:
-                title = a_tag.get_text(strip=True)
-                url = a_tag.get('href', '')
-                if title and len(title) > 10:
-                    titles.append(title)
-                    urls.append(url)
-        
-        df = pd.DataFrame({
-            'keyword': titles[:30],  # Top 30 stories
-            'url': urls[:30]
-        })
-        df['source'] = 'Hacker News'
-        df['rank'] = range(1, len(df) + 1)
-        return df
-    except Exception as e:
-        st.error(f"Error fetching Hacker News data: {str(e)}")
-        return pd.DataFrame(columns=['keyword', 'source', 'rank', 'url'])
+source_cache = get_source_cache()
 
-def extract_keywords_from_text(text):
-    """Extract meaningful keywords from text"""
-    # Remove common words and extract meaningful terms
-    stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them'}
-    
-    # Extract words (2+ characters, alphanumeric)
-    words = re.findall(r'\b[a-zA-Z]{2,}\b', text.lower())
-    keywords = [word for word in words if word not in stop_words and len(word) > 2]
-    
-    return keywords
-
-def extract_domains_from_urls(urls):
-    """Extract domains from URLs"""
-    domains = []
-    for url in urls:
-        try:
-            if url.startswith('http'):
-                domain = urlparse(url).netloc
-                if domain:
-                    domains.append(domain)
-        except:
-            continue
-    return domains
-
-def clean_and_aggregate_data(gt_data, reddit_data, hn_data):
-    """Clean and aggregate data from all sources"""
-    all_data = []
-    
-    # Process Google Trends data
-    for _, row in gt_data.iterrows():
-        all_data.append({
-            'keyword': row['keyword'],
-            'source': 'Google Trends',
-            'rank': row['rank'],
-            'type': 'keyword'
-        })
-    
-    # Process Reddit data
-    reddit_keywords = []
-    for _, row in reddit_data.iterrows():
-        keywords = extract_keywords_from_text(row['keyword'])
-        reddit_keywords.extend(keywords)
-        all_data.append({
-            'keyword': row['keyword'][:100],  # Truncate long titles
-            'source': 'Reddit',
-            'rank': row['rank'],
-            'type': 'post_title'
-        })
-    
-    # Process Hacker News data
-    hn_keywords = []
-    hn_domains = []
-    for _, row in hn_data.iterrows():
-        keywords = extract_keywords_from_text(row['keyword'])
-        hn_keywords.extend(keywords)
-        all_data.append({
-            'keyword': row['keyword'][:100],  # Truncate long titles
-            'source': 'Hacker News',
-            'rank': row['rank'],
-            'type': 'post_title'
-        })
-        
-        # Extract domains if URL available
-        if 'url' in row and pd.notna(row['url']):
-            domains = extract_domains_from_urls([row['url']])
-            hn_domains.extend(domains)
-    
-    # Add extracted keywords
-    keyword_counts = Counter(reddit_keywords + hn_keywords)
-    for keyword, count in keyword_counts.most_common(20):
-        all_data.append({
-            'keyword': keyword,
-            'source': 'Extracted',
-            'rank': count,
-            'type': 'extracted_keyword'
-        })
-    
-    # Add domains
-    domain_counts = Counter(hn_domains)
-    for domain, count in domain_counts.most_common(10):
-        all_data.append({
-            'keyword': domain,
-            'source': 'Domains',
-            'rank': count,
-            'type': 'domain'
-        })
-    
-    return pd.DataFrame(all_data)
+SOURCES = registered_sources()
+
+def load_source(source):
+    """Load a source through the shared disk cache"""
+    if COLLECTOR_MODE:
+        entry = source_cache.get(source.key)
+        return entry[0] if entry is not None else source.empty_frame()
+    return source_cache.get_or_fetch(source.key, source.run, ttl=source.ttl)
+
+def fetch_all_sources(sources, on_result=None):
+    """Load all sources in parallel through the cache, reporting each one as it finishes"""
+    def report(source, df, error):
+        if error:
+            st.warning(error)
+        if on_result:
+            on_result(source, df)
+
+    return run_sources(sources, load=load_source, on_result=report)
 
 # Sidebar controls
 st.sidebar.header("🔧 Controls")
-refresh_data = st.sidebar.button("🔄 Refresh Data", help="Fetch latest trending data")
-if refresh_data:
-    st.cache_data.clear()
-    st.rerun()
+if COLLECTOR_MODE:
+    st.sidebar.info("Data is refreshed in the background by the collector.")
+else:
+    refresh_sources = st.sidebar.multiselect(
+        "Sources to refresh:",
+        options=[source.name for source in SOURCES],
+        default=[source.name for source in SOURCES]
+    )
+    refresh_data = st.sidebar.button("🔄 Refresh Data", help="Fetch latest trending data for the selected sources")
+    if refresh_data:
+        for source in SOURCES:
+            if source.name in refresh_sources:
+                # Cached data stays as a fallback until the refetch succeeds
+                for key in (source.key, *source.related_cache_keys):
+                    source_cache.invalidate(key)
+        st.rerun()
+
+# Show when each source was last collected
+for source in SOURCES:
+    fetched_at = source_cache.fetched_at(source.key)
+    if fetched_at is not None:
+        st.sidebar.caption(f"{source.name}: updated {time.strftime('%Y-%m-%d %H:%M', time.localtime(fetched_at))}")
+
+# Google Trends throttling in this process; cached data is served until it clears
+trends_quota = trends_client.quota_state()
+if trends_quota['state'] != 'closed':
+    st.sidebar.warning(f"Google Trends is rate limiting requests; showing cached data (next attempt in {trends_quota['retry_in']:.0f}s).")
+elif trends_quota['rate'] < trends_quota['max_rate']:
+    st.sidebar.caption(f"Google Trends: slowed to {trends_quota['rate']:.2f} requests/s after throttling")
 
 # Main content area
+# Metric placeholders are filled in as each source finishes
+metric_columns = st.columns(len(SOURCES) + 1)
+metric_slots = {}
+for column, source in zip(metric_columns, SOURCES):
+    metric_slots[source.key] = column.empty()
+    metric_slots[source.key].metric(source.label, "…")
+total_slot = metric_columns[-1].empty()
+total_slot.metric("Total Keywords", "…")
+
+def show_source_metric(source, df):
+    metric_slots[source.key].metric(source.label, len(df))
+
+def snapshot_key(source_data):
+    """Content hash of the loaded source frames, identifying what the aggregation was built from"""
+    return tuple(
+        (key, len(df), int(pd.util.hash_pandas_object(df, index=False).sum()))
+        for key, df in sorted(source_data.items())
+    )
+
+@st.cache_resource(max_entries=4)
+def get_overview_index(data_key, _source_data):
+    """Aggregated table with its source/type filter index, built once per set of source frames"""
+    return OverviewIndex(clean_and_aggregate_data(_source_data, SOURCES))
+
+@st.cache_data(max_entries=32)
+def merge_overview_entities(data_key, sources, types, _overview):
+    """Merged entities for one filter combination"""
+    return merge_entities(_overview.select(sources, types))
+
+@st.cache_data(max_entries=32)
+def export_overview(data_key, sources, types, file_format, _overview):
+    """CSV or Parquet export for one filter combination, generated on first download"""
+    return _overview.export(sources, types, file_format)
+
 with st.spinner("Fetching trending data..."):
-    # Fetch data from all sources
-    gt_data = fetch_google_trends()
-    reddit_data = fetch_reddit_trends()
-    hn_data = fetch_hackernews_trends()
+    # Fetch data from all sources in parallel
+    source_data = fetch_all_sources(SOURCES, on_result=show_source_metric)
+    gt_data = source_data['google_trends']
+    reddit_data = source_data['reddit']
+    hn_data = source_data['hackernews']
     
-    # Aggregate and clean data
-    aggregated_data = clean_and_aggregate_data(gt_data, reddit_data, hn_data)
-
-# Display metrics
-col1, col2, col3, col4 = st.columns(4)
-with col1:
-    st.metric("Google Trends", len(gt_data))
-with col2:
-    st.metric("Reddit Posts", len(reddit_data))
-with col3:
-    st.metric("Hacker News", len(hn_data))
-with col4:
-    st.metric("Total Keywords", len(aggregated_data))
+    # Aggregate and clean data, once per distinct set of source frames
+    data_key = snapshot_key(source_data)
+    overview = get_overview_index(data_key, source_data)
+    aggregated_data = overview.frame
+
+total_slot.metric("Total Keywords", len(aggregated_data))
+
+@st.cache_resource
+def get_keyword_store():
+    """Rolling keyword counts shared by every session"""
+    return KeywordCountStore()
+
+@st.cache_resource
+def get_history_store():
+    """Parquet history of aggregated snapshots"""
+    return HistoryStore()
+
+history_store = get_history_store()
+
+@st.cache_resource
+def compact_history(day):
+    """Compact finished history days once per UTC day and process; the collector does this in collector mode"""
+    try:
+        history_store.compact_before()
+    except Exception as e:
+        logger.warning(f"Could not compact history: {str(e)}")
+
+if not COLLECTOR_MODE:
+    compact_history(datetime.now(timezone.utc).strftime('%Y-%m-%d'))
+
+# Scores cover about five half-lives, so warm them up from the last two days of history
+SCORE_HISTORY_DAYS = 2
+
+@st.cache_resource
+def get_trend_scores():
+    """Decayed cross-source scores shared by every session, warmed up from stored snapshots"""
+    trend_scores = TrendScores()
+    try:
+        trend_scores.warm_from_history(history_store.query(start=datetime.now(timezone.utc) - timedelta(days=SCORE_HISTORY_DAYS)))
+    except Exception as e:
+        # Scores then start from the current snapshot alone
+        logger.warning(f"Could not warm up trend scores from history: {str(e)}")
+    return trend_scores
+
+trend_scores = get_trend_scores()
+
+fetch_times = {source.key: source_cache.fetched_at(source.key) for source in SOURCES}
+if any(fetch_times.values()):
+    collected_at = max(t for t in fetch_times.values() if t)
+    # Record this combination of source snapshots once; the collector does this itself in collector mode
+    if not COLLECTOR_MODE:
+        history_store.append(aggregated_data, collected_at=collected_at, snapshot_id=snapshot_id_for(fetch_times))
+    # Each snapshot is scored once, however many reruns and sessions see it, and only for the sources that changed
+    trend_scores.update(aggregated_data, collected_at)
+
+# Merge each new source snapshot's titles into the rolling counts once; the collector does this in collector mode
+keyword_store = get_keyword_store()
+if not COLLECTOR_MODE:
+    for source in SOURCES:
+        if source.content_type == 'post_title':
+            merge_source_keywords(source_cache, keyword_store, source)
+
+# Keywords accepted by the comparison mode of the Keyword Search tab
+MAX_COMPARE_KEYWORDS = 20
+
+def frequencies_hash(frequencies):
+    """Stable hash of keyword frequencies, used as the word cloud cache key"""
+    return hashlib.sha1(repr(sorted(frequencies.items())).encode('utf-8')).hexdigest()
+
+@st.cache_data(max_entries=64)
+def render_wordcloud_png(frequencies_key, _frequencies):
+    """Render a word cloud straight to PNG bytes, cached per frequency hash"""
+    return wordcloud_png(_frequencies)
+
+@st.cache_data(ttl=600)
+def load_keyword_history(days):
+    """Extracted keyword snapshots of the last `days` days, reading only the partitions and columns needed"""
+    start = datetime.now(timezone.utc) - timedelta(days=days)
+    return history_store.query(start=start, types=['extracted_keyword'], columns=['collected_at', 'keyword', 'rank'])
 
 # Tabs for different views
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Overview", "🔍 Google Trends", "📱 Reddit", "💻 Hacker News", "🎯 Keyword Search"])
+# Built-in sources have their own tabs; plugin sources get a generic one each
+BUILTIN_SOURCE_KEYS = {'google_trends', 'reddit', 'hackernews'}
+plugin_sources = [source for source in SOURCES if source.key not in BUILTIN_SOURCE_KEYS]
+tab1, tab2, tab3, tab4, tab5, tab6, *plugin_tabs = st.tabs(
+    ["📊 Overview", "🔍 Google Trends", "📱 Reddit", "💻 Hacker News", "🎯 Keyword Search", "🕒 History"] +
+    [f"🧩 {source.name}" for source in plugin_sources]
+)
 
 with tab1:
     st.header("📊 Trending Keywords Overview")
@@ -341,70 +267,112 @@ with tab1:
     with col1:
         selected_sources = st.multiselect(
             "Select data sources:",
-            options=aggregated_data['source'].unique(),
-            default=aggregated_data['source'].unique()
+            options=overview.sources,
+            default=overview.sources
         )
     with col2:
         selected_types = st.multiselect(
             "Select content types:",
-            options=aggregated_data['type'].unique(),
-            default=aggregated_data['type'].unique()
+            options=overview.types,
+            default=overview.types
         )
     
-    # Filter data
-    filtered_data = aggregated_data[
-        (aggregated_data['source'].isin(selected_sources)) &
-        (aggregated_data['type'].isin(selected_types))
-    ]
+    # Filtered views are assembled from the precomputed (source, type) groups
+    filter_key = (tuple(selected_sources), tuple(selected_types))
+    source_counts = overview.source_counts(*filter_key)
     
-    if not filtered_data.empty:
+    if source_counts.sum() > 0:
         # Word cloud
         col1, col2 = st.columns([2, 1])
         with col1:
             st.subheader("☁️ Trending Keywords Word Cloud")
             try:
-                text = ' '.join(filtered_data['keyword'].astype(str))
-                wordcloud = WordCloud(
-                    width=800, 
-                    height=400, 
-                    background_color='white',
-                    colormap='viridis',
-                    max_words=100
-                ).generate(text)
-                
-                fig, ax = plt.subplots(figsize=(10, 5))
-                ax.imshow(wordcloud, interpolation='bilinear')
-                ax.axis('off')
-                st.pyplot(fig)
+                frequencies = overview.keyword_frequencies(*filter_key)
+                st.image(render_wordcloud_png(frequencies_hash(frequencies), frequencies))
             except Exception as e:
                 st.error(f"Error generating word cloud: {str(e)}")
         
         with col2:
             st.subheader("📈 Top Keywords by Source")
-            source_counts = filtered_data['source'].value_counts()
             st.bar_chart(source_counts)
         
-        # Top keywords table
+        # Top keywords table, read from the precomputed score index
         st.subheader("🔥 Top Trending Keywords")
-        top_keywords = filtered_data.head(20)
+        top_keywords = trend_scores.top(20, sources=set(selected_sources), types=set(selected_types))
         st.dataframe(
             top_keywords,
             use_container_width=True,
             hide_index=True
         )
         
-        # Download option
-        csv = filtered_data.to_csv(index=False)
-        st.download_button(
-            label="📥 Download CSV",
-            data=csv,
-            file_name="nettrends_data.csv",
-            mime="text/csv"
-        )
+        # Same keyword from different sources, spellings and casings merged into one entity
+        entities = merge_overview_entities(data_key, *filter_key, overview)
+        if not entities.empty:
+            st.subheader("🧬 Keywords Across Sources")
+            st.dataframe(entities.head(20), use_container_width=True, hide_index=True)
+        
+        # Download options; files are only generated when a button is clicked
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                label="📥 Download CSV",
+                data=lambda: export_overview(data_key, *filter_key, 'csv', overview),
+                file_name="nettrends_data.csv",
+                mime="text/csv"
+            )
+        with col2:
+            st.download_button(
+                label="📥 Download Parquet",
+                data=lambda: export_overview(data_key, *filter_key, 'parquet', overview),
+                file_name="nettrends_data.parquet",
+                mime="application/vnd.apache.parquet"
+            )
+    
+    # Keyword history across refreshes
+    st.subheader("🚀 Rising Keywords")
+    window_hours = st.selectbox(
+        "Time window:",
+        options=[1, 6, 24, 168],
+        index=2,
+        format_func=lambda hours: f"Last {hours} hours" if hours < 168 else "Last 7 days"
+    )
+    col1, col2 = st.columns(2)
+    with col1:
+        st.caption("Most mentioned")
+        st.dataframe(keyword_store.top(15, hours=window_hours), use_container_width=True, hide_index=True)
+    with col2:
+        st.caption("Fastest rising (mentions per hour vs. the previous window)")
+        st.dataframe(keyword_store.rising(15, hours=window_hours), use_container_width=True, hide_index=True)
 
 with tab2:
     st.header("🔍 Google Trends")
-    if not gt_data.empty:
+    if not gt_data.empty and 'region' in gt_data.columns:
+        # One row per keyword and region; keywords trending in more regions rank first
+        by_keyword = gt_data.groupby('rank', sort=True).agg(
+            keyword=('keyword', 'first'),
+            regions=('regions', 'first'),
+            overlap_score=('overlap_score', 'first'),
+            trending_in=('region', lambda regions: ', '.join(regions))
+        ).reset_index()
+        
+        st.subheader("🌍 Trending Across Regions")
+        st.dataframe(by_keyword, use_container_width=True, hide_index=True)
+        
+        st.subheader("📊 Top 10 Trends")
+        st.bar_chart(by_keyword.head(10).set_index('keyword')['overlap_score'])
+        
+        st.subheader("Current Trending Searches by Region")
+        configured = [region_label(region) for region in TRENDS_REGIONS]
+        region_options = sorted(
+            dict.fromkeys(gt_data['region']),
+            key=lambda region: configured.index(region) if region in configured else len(configured)
+        )
+        region = st.selectbox("Region:", options=region_options)
+        st.dataframe(
+            gt_data[gt_data['region'] == region].sort_values('region_rank')[['keyword', 'region_rank', 'regions']],
+            use_container_width=True, hide_index=True
+        )
+    elif not gt_data.empty:
         st.subheader("Current Trending Searches")
         st.dataframe(gt_data, use_container_width=True, hide_index=True)
         
@@ -423,9 +391,7 @@ with tab3:
         st.dataframe(reddit_data, use_container_width=True, hide_index=True)
         
         # Extract and show common keywords
-        all_reddit_text = ' '.join(reddit_data['keyword'].astype(str))
-        reddit_keywords = extract_keywords_from_text(all_reddit_text)
-        keyword_counts = Counter(reddit_keywords)
+        keyword_counts = Counter(iter_keywords(reddit_data['keyword']))
         
         st.subheader("🏷️ Most Common Keywords")
         common_keywords = pd.DataFrame(
@@ -433,19 +399,30 @@ with tab3:
             columns=['keyword', 'frequency']
         )
         st.bar_chart(common_keywords.set_index('keyword')['frequency'])
+        
+        # Outbound links are only available from the JSON listings
+        if 'url' in reddit_data.columns:
+            domain_counts = Counter(registrable_domains(reddit_data['url']).dropna())
+            
+            if domain_counts:
+                st.subheader("🌐 Most Linked Domains")
+                domain_df = pd.DataFrame(
+                    domain_counts.most_common(10),
+                    columns=['domain', 'frequency']
+                )
+                st.bar_chart(domain_df.set_index('domain')['frequency'])
     else:
         st.warning("No Reddit data available")
 
 with tab4:
     st.header("💻 Hacker News")
     if not hn_data.empty:
-        st.subheader("Front Page Stories")
+        st.subheader("Top Stories")
         st.dataframe(hn_data, use_container_width=True, hide_index=True)
         
         # Extract and show domains
         if 'url' in hn_data.columns:
-            domains = extract_domains_from_urls(hn_data['url'].fillna(''))
-            domain_counts = Counter(domains)
+            domain_counts = Counter(registrable_domains(hn_data['url'], base_url=HN_FRONT_PAGE).dropna())
             
             if domain_counts:
                 st.subheader("🌐 Most Common Domains")
@@ -460,13 +437,23 @@ with tab4:
 with tab5:
     st.header("🎯 Keyword Trend Analysis")
     
+    mode = st.radio("Analysis mode:", ["Single keyword", "Compare keywords"], horizontal=True)
+    
     # Keyword search input
     col1, col2 = st.columns([3, 1])
     with col1:
-        user_keyword = st.text_input(
-            "Enter a keyword to analyze its trend:",
-            placeholder="e.g., artificial intelligence, cryptocurrency, climate change"
-        )
+        if mode == "Single keyword":
+            user_keyword = st.text_input(
+                "Enter a keyword to analyze its trend:",
+                placeholder="e.g., artificial intelligence, cryptocurrency, climate change"
+            )
+            compare_input = ''
+        else:
+            compare_input = st.text_input(
+                f"Enter up to {MAX_COMPARE_KEYWORDS} keywords to compare, separated by commas:",
+                placeholder="e.g., notion, obsidian, evernote, logseq, roam research"
+            )
+            user_keyword = ''
     with col2:
         time_range = st.selectbox(
             "Time range:",
@@ -474,19 +461,15 @@ with tab5:
             index=2
         )
     
+    user_keyword = user_keyword.strip()
     if user_keyword:
         with st.spinner(f"Analyzing trend for '{user_keyword}'..."):
             try:
-                # Create pytrends object with better error handling
-                pytrends = TrendReq(hl='en-US', tz=360, timeout=(10,25), retries=2, backoff_factor=0.1)
-                kw_list = [user_keyword]
-                
-                # Try to build payload with error handling
+                # Cached lookup: interest, related queries and regional interest are fetched together
+                # and identical lookups from other sessions are shared
                 try:
-                    pytrends.build_payload(kw_list, cat=0, timeframe=time_range, geo='US', gprop='')
-                    
-                    # Get interest over time
-                    interest_data = pytrends.interest_over_time()
+                    lookup = lookup_keyword_trend(user_keyword, time_range, geo='US')
+                    interest_data = lookup['interest']
                     
                     if not interest_data.empty and user_keyword in interest_data.columns:
                         st.subheader(f"📈 Trend Analysis for '{user_keyword}'")
@@ -507,32 +490,26 @@ with tab5:
                         else:
                             st.warning("No trend data points available for visualization.")
                         
-                        # Related queries with better error handling
-                        try:
-                            related_queries = pytrends.related_queries()
-                            if (user_keyword in related_queries and 
-                                related_queries[user_keyword]['top'] is not None and 
-                                not related_queries[user_keyword]['top'].empty):
-                                st.subheader("🔗 Related Queries")
-                                st.dataframe(related_queries[user_keyword]['top'])
-                        except Exception as rq_error:
+                        # Related queries
+                        if lookup['related'] is not None:
+                            st.subheader("🔗 Related Queries")
+                            st.dataframe(lookup['related'])
+                        else:
                             st.info("Related queries not available for this keyword.")
                         
-                        # Regional interest with better error handling
-                        try:
-                            regional_interest = pytrends.interest_by_region(resolution='COUNTRY')
-                            if not regional_interest.empty and user_keyword in regional_interest.columns:
-                                # Filter out zero values and get top regions
-                                regional_data = regional_interest[user_keyword]
-                                regional_data = regional_data[regional_data > 0]
-                                
-                                if not regional_data.empty:
-                                    st.subheader("🌍 Regional Interest")
-                                    top_regions = regional_data.sort_values(ascending=False).head(10)
-                                    st.bar_chart(top_regions)
-                                else:
-                                    st.info("No regional data available for this keyword.")
-                        except Exception as ri_error:
+                        # Regional interest
+                        if lookup['regional'] is not None:
+                            # Filter out zero values and get top regions
+                            regional_data = lookup['regional']
+                            regional_data = regional_data[regional_data > 0]
+                            
+                            if not regional_data.empty:
+                                st.subheader("🌍 Regional Interest")
+                                top_regions = regional_data.sort_values(ascending=False).head(10)
+                                st.bar_chart(top_regions)
+                            else:
+                                st.info("No regional data available for this keyword.")
+                        else:
                             st.info("Regional interest data not available for this keyword.")
                     else:
                         st.warning(f"No trend data available for '{user_keyword}'. This could be due to:")
@@ -540,6 +517,8 @@ with tab5:
                         st.write("• Google Trends API limitations")
                         st.write("• Try a more general or popular keyword")
                         
+                except TrendsUnavailable as throttled:
+                    st.warning(f"{str(throttled)}. Please try this keyword again later.")
                 except Exception as payload_error:
                     st.error(f"Error building search query: {str(payload_error)}")
                     st.write("Try using:")
@@ -554,6 +533,89 @@ with tab5:
                 st.write("• Try a different keyword")
                 st.write("• Wait a moment and try again (rate limiting)")
 
+    # Multi-keyword comparison, batched 5 terms per Trends payload
+    compare_keywords = list(dict.fromkeys(k.strip() for k in compare_input.split(',') if k.strip()))[:MAX_COMPARE_KEYWORDS]
+    if len(compare_keywords) == 1:
+        st.info("Enter at least two keywords to compare, or switch to single keyword mode.")
+    elif compare_keywords:
+        request_count = payloads_needed(len(compare_keywords))
+        with st.spinner(f"Comparing {len(compare_keywords)} keywords in {request_count} Trends payload(s)..."):
+            try:
+                comparison = lookup_keyword_comparison(compare_keywords, time_range, geo='US')
+                interest_data = comparison['interest']
+                
+                if not interest_data.empty:
+                    st.subheader("📈 Interest Over Time")
+                    st.line_chart(interest_data)
+                    
+                    st.subheader("📊 Average Interest")
+                    st.bar_chart(interest_data.mean().sort_values(ascending=False))
+                    
+                    missing = [keyword for keyword in compare_keywords if keyword not in interest_data.columns]
+                    if missing:
+                        st.info("No comparable data for: " + ", ".join(missing))
+                    
+                    # Regional interest, top 10 regions across all keywords
+                    regional_data = comparison['regional']
+                    if not regional_data.empty:
+                        st.subheader("🌍 Regional Interest")
+                        top_regions = regional_data.sum(axis=1).sort_values(ascending=False).head(10).index
+                        st.bar_chart(regional_data.loc[top_regions])
+                    
+                    if comparison['related']:
+                        st.subheader("🔗 Related Queries")
+                        for keyword, queries in comparison['related'].items():
+                            with st.expander(keyword):
+                                st.dataframe(queries, use_container_width=True, hide_index=True)
+                else:
+                    st.warning("No trend data available for these keywords. Try more common keywords or a different time range.")
+                    
+            except TrendsUnavailable as throttled:
+                st.warning(f"{str(throttled)}. Please try this comparison again later.")
+            except Exception as e:
+                st.error(f"Error comparing keywords: {str(e)}")
+                st.write("**Troubleshooting tips:**")
+                st.write("• Check your internet connection")
+                st.write("• Wait a moment and try again (rate limiting)")
+
+with tab6:
+    st.header("🕒 Keyword History")
+    
+    history_days = st.selectbox(
+        "Period:",
+        options=[14, 30, 90],
+        format_func=lambda days: f"Last {days} days"
+    )
+    history = load_keyword_history(history_days)
+    
+    if not history.empty:
+        all_keywords = history.assign(keyword=history['keyword'].astype(str)).groupby('keyword')['rank'].sum()
+        all_keywords = all_keywords.sort_values(ascending=False)
+        daily = daily_keyword_counts(history, all_keywords.index)
+        
+        selected_keywords = st.multiselect(
+            "Keywords to chart:",
+            options=list(all_keywords.index),
+            default=list(all_keywords.index[:5])
+        )
+        if selected_keywords:
+            st.subheader("📈 Daily Mentions")
+            st.line_chart(daily[selected_keywords])
+        
+        st.subheader("📅 Week over Week")
+        st.dataframe(week_over_week(daily).head(20), use_container_width=True, hide_index=True)
+    else:
+        st.info("No history collected yet. A snapshot is stored every time the source data is refreshed.")
+
+for plugin_tab, source in zip(plugin_tabs, plugin_sources):
+    with plugin_tab:
+        st.header(f"🧩 {source.name}")
+        plugin_data = source_data[source.key]
+        if not plugin_data.empty:
+            st.dataframe(plugin_data, use_container_width=True, hide_index=True)
+        else:
+            st.warning(f"No {source.name} data available")
+
 # Footer
 st.markdown("---")
 st.markdown(
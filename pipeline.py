@@ -0,0 +1,76 @@
+"""
+Streaming helpers for the fetch -> tokenize/extract -> count pipeline.
+
+Fetchers yield one record (a dict) per item as it arrives, iter_parallel
+runs several of them at once with bounded buffers in between, the tokenize
+and domain stages (Tokenizer.iter_tokens, aggregation.iter_domains) are
+generators, and counts
+are kept in Counters updated as items stream through. Tables are only built
+where one is needed, the source cache and the dashboard, with
+records_to_frame filling one list per column instead of keeping a list of
+dicts around next to the frame.
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+_DONE = object()
+
+
+def records_to_frame(records, columns, dtypes=None):
+    """Build a frame with the given columns from an iterable of record dicts"""
+    data = {column: [] for column in columns}
+    appenders = [(column, data[column].append) for column in columns]
+    for record in records:
+        for column, append in appenders:
+            append(record.get(column))
+    df = pd.DataFrame(data, columns=columns)
+    if dtypes:
+        df = df.astype(dtypes)
+    return df
+
+
+def iter_parallel(producers, max_workers, buffer):
+    """Yield the items of several producers in producer order, running them in parallel
+
+    Each producer is a callable returning an iterable. It runs in a worker
+    thread and hands items over through a queue of at most `buffer` items, so
+    a producer that runs ahead of the consumer blocks instead of holding its
+    whole output in memory. A producer that fails just ends early; items it
+    produced before are kept.
+    """
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize=buffer) for _ in producers]
+
+    def put(items, item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run(produce, items):
+        try:
+            for item in produce():
+                if not put(items, item):
+                    return
+        except Exception:
+            pass
+        finally:
+            put(items, _DONE)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(producers)))) as executor:
+        for produce, items in zip(producers, queues):
+            executor.submit(run, produce, items)
+        try:
+            for items in queues:
+                while (item := items.get()) is not _DONE:
+                    yield item
+        finally:
+            # Unblock producers if the consumer stops early
+            stop.set()
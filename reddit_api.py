@@ -0,0 +1,97 @@
+"""
+Reddit ingestion through the public .json listing endpoints.
+
+iter_listing() is a generator that walks a subreddit listing page by page,
+following the `after` cursor, and yields one record per post with its score,
+comment count and outbound URL. Pages are decoded with orjson when it is
+installed, so parse cost stays linear in the number of posts.
+"""
+
+import os
+from functools import partial
+
+from http_client import polite_get
+from pipeline import iter_parallel, records_to_frame
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:
+    import json
+
+    _loads = json.loads
+
+REDDIT_BASE_URL = os.environ.get('NETTRENDS_REDDIT_BASE', 'https://www.reddit.com').rstrip('/')
+REDDIT_LISTING = os.environ.get('NETTRENDS_REDDIT_LISTING', 'hot')
+REDDIT_MAX_POSTS = int(os.environ.get('NETTRENDS_REDDIT_MAX_POSTS', '250'))  # per subreddit
+REDDIT_PAGE_SIZE = 100  # the most a listing page returns
+
+
+def _record(post):
+    return {
+        'id': post.get('name'),
+        'title': post.get('title') or '',
+        'subreddit': post.get('subreddit'),
+        'score': post.get('score') or 0,
+        'comments': post.get('num_comments') or 0,
+        # Self posts link back to Reddit itself, which says nothing about outbound domains
+        'url': '' if post.get('is_self') else (post.get('url_overridden_by_dest') or post.get('url') or ''),
+    }
+
+
+def iter_listing(subreddit, limiter=None, listing=None, max_posts=None):
+    """Yield post records from a subreddit listing, following `after` cursors"""
+    max_posts = max_posts or REDDIT_MAX_POSTS
+    after = None
+    yielded = 0
+    while yielded < max_posts:
+        params = {'limit': min(REDDIT_PAGE_SIZE, max_posts - yielded), 'raw_json': 1}
+        if after:
+            params['after'] = after
+        response = polite_get(f'{REDDIT_BASE_URL}/r/{subreddit}/{listing or REDDIT_LISTING}.json', limiter=limiter, params=params)
+        response.raise_for_status()
+        page = _loads(response.content).get('data') or {}
+
+        children = page.get('children') or []
+        for child in children:
+            if child.get('kind') != 't3':
+                continue
+            yield _record(child.get('data') or {})
+            yielded += 1
+            if yielded >= max_posts:
+                return
+
+        after = page.get('after')
+        if not after or not children:
+            return
+
+
+def iter_posts(subreddits, limiter=None, max_posts=None, max_workers=8):
+    """Yield post records from several subreddits, listings fetched in parallel
+
+    Records follow the order of `subreddits`; posts already seen in an earlier
+    subreddit (r/all and r/popular overlap a lot) are skipped. Each listing
+    buffers at most one page ahead of the consumer, and a listing that fails
+    keeps the posts of its earlier pages.
+    """
+    listings = [partial(iter_listing, subreddit, limiter, max_posts=max_posts) for subreddit in subreddits]
+    seen = set()
+    for record in iter_parallel(listings, max_workers, buffer=REDDIT_PAGE_SIZE):
+        if record['id'] in seen or len(record['title']) <= 10:
+            continue
+        seen.add(record['id'])
+        yield record
+
+
+def fetch_reddit_api(subreddits, limiter=None, max_posts=None, max_workers=8):
+    """Fetch posts from several subreddits into one frame"""
+    df = records_to_frame(
+        ({'keyword': record['title'], 'url': record['url'], 'score': record['score'], 'comments': record['comments']}
+         for record in iter_posts(subreddits, limiter, max_posts, max_workers)),
+        ['keyword', 'url', 'score', 'comments'],
+        dtypes={'score': 'int64', 'comments': 'int64'}
+    )
+    df['source'] = 'Reddit'
+    df['rank'] = range(1, len(df) + 1)
+    return df[['keyword', 'source', 'rank', 'url', 'score', 'comments']]
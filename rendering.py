@@ -0,0 +1,22 @@
+"""
+Word cloud rendering, shared by the dashboard and the benchmarks.
+"""
+
+import io
+
+from wordcloud import WordCloud
+
+
+def wordcloud_png(frequencies):
+    """Render keyword frequencies as a word cloud, returned as PNG bytes"""
+    wordcloud = WordCloud(
+        width=800, 
+        height=400, 
+        background_color='white',
+        colormap='viridis',
+        max_words=100
+    ).generate_from_frequencies(frequencies)
+    
+    buffer = io.BytesIO()
+    wordcloud.to_image().save(buffer, format='PNG')
+    return buffer.getvalue()
@@ -0,0 +1,143 @@
+"""
+Conditional fetching for the HTML scrapers.
+
+For every scraped URL and parser we keep the response validators
+(ETag/Last-Modified), a zlib-compressed copy of the raw body, its hash and
+the parsed result. The
+next fetch sends If-None-Match/If-Modified-Since; on a 304, or when the new
+body hashes the same as the stored one, the stored parse result is reused and
+the page is not parsed again.
+"""
+
+import hashlib
+import pickle
+import sqlite3
+import time
+import zlib
+from contextlib import contextmanager
+
+from disk_cache import data_path
+from http_client import polite_get
+
+
+class ResponseStore:
+    """SQLite store of validators, compressed bodies and parse results per URL and parser"""
+
+    def __init__(self, path=None):
+        self.path = path or data_path('responses.sqlite')
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(responses)')]
+            if columns and 'parser' not in columns:
+                # Stores from before parse results were keyed by parser; it is only a cache
+                conn.execute('DROP TABLE responses')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                ' url TEXT NOT NULL, parser TEXT NOT NULL, etag TEXT, last_modified TEXT,'
+                ' body_hash TEXT NOT NULL, body BLOB NOT NULL,'
+                ' parsed BLOB, fetched_at REAL NOT NULL,'
+                ' PRIMARY KEY (url, parser))'
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def get(self, url, parser):
+        """Return the stored record for a URL and parser as a dict, or None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT etag, last_modified, body_hash, body, parsed, fetched_at FROM responses'
+                ' WHERE url = ? AND parser = ?',
+                (url, parser)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, body_hash, body, parsed, fetched_at = row
+        return {
+            'etag': etag,
+            'last_modified': last_modified,
+            'body_hash': body_hash,
+            'body': body,  # zlib-compressed
+            'parsed': pickle.loads(parsed) if parsed is not None else None,
+            'fetched_at': fetched_at,
+        }
+
+    def put(self, url, parser, response, body_hash, parsed):
+        """Store a fresh response together with its parse result"""
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO responses (url, parser, etag, last_modified, body_hash, body, parsed, fetched_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    url,
+                    parser,
+                    response.headers.get('ETag'),
+                    response.headers.get('Last-Modified'),
+                    body_hash,
+                    zlib.compress(response.content, 6),
+                    pickle.dumps(parsed, protocol=pickle.HIGHEST_PROTOCOL),
+                    time.time(),
+                )
+            )
+
+    def touch(self, url, parser):
+        """Mark a stored response as revalidated"""
+        with self._connect() as conn:
+            conn.execute('UPDATE responses SET fetched_at = ? WHERE url = ? AND parser = ?', (time.time(), url, parser))
+
+
+_store = None
+
+
+def get_response_store():
+    """Return the process-wide response store"""
+    global _store
+    if _store is None:
+        _store = ResponseStore()
+    return _store
+
+
+def parser_key(parse):
+    """Name identifying a parse function in the store"""
+    return f'{getattr(parse, "__module__", "")}.{getattr(parse, "__qualname__", repr(parse))}'
+
+
+def fetch_parsed(url, parse, store=None, **kwargs):
+    """Conditionally GET a URL and return parse(body)
+
+    The stored parse result is returned without parsing when the server
+    answers 304 Not Modified or the body is byte-for-byte unchanged. Parse
+    results are kept per parser, so different parsers of one URL never see
+    each other's results.
+    """
+    store = store or get_response_store()
+    parser = parser_key(parse)
+    record = store.get(url, parser)
+
+    headers = dict(kwargs.pop('headers', None) or {})
+    if record is not None and record['parsed'] is not None:
+        if record['etag']:
+            headers['If-None-Match'] = record['etag']
+        if record['last_modified']:
+            headers['If-Modified-Since'] = record['last_modified']
+
+    response = polite_get(url, headers=headers, **kwargs)
+
+    if response.status_code == 304 and record is not None and record['parsed'] is not None:
+        store.touch(url, parser)
+        return record['parsed']
+    response.raise_for_status()
+
+    body_hash = hashlib.sha256(response.content).hexdigest()
+    if record is not None and record['parsed'] is not None and record['body_hash'] == body_hash:
+        store.touch(url, parser)
+        return record['parsed']
+
+    parsed = parse(response.content)
+    store.put(url, parser, response, body_hash, parsed)
+    return parsed
@@ -7,11 +7,11 @@ without the Streamlit interface for testing purposes.
 
 import pandas as pd
 from pytrends.request import TrendReq
-import requests
 from bs4 import BeautifulSoup
-import time
 from collections import Counter
-import re
+from http_client import polite_get
+from tokenizer import extract_keywords
+from trends_batching import fetch_batched_interest, summarize_interest
 
 def demo_google_trends():
     """Demo function to test Google Trends functionality"""
@@ -56,23 +56,10 @@ def demo_google_trends():
         # Method 3: Try current interest method
         try:
             popular_keywords = ['AI', 'Bitcoin', 'Tesla', 'iPhone', 'Netflix']
-            trending_data = []
+            interest = fetch_batched_interest(pytrends, popular_keywords, timeframe='now 1-d')
+            trending_df = summarize_interest(interest)
             
-            for keyword in popular_keywords:
-                try:
-                    pytrends.build_payload([keyword], cat=0, timeframe='now 1-d')
-                    interest = pytrends.interest_over_time()
-                    if not interest.empty and keyword in interest.columns:
-                        avg_interest = interest[keyword].mean()
-                        if avg_interest > 0:
-                            trending_data.append({'keyword': keyword, 'interest': avg_interest})
-                    time.sleep(0.1)
-                except:
-                    continue
-            
-            if trending_data:
-                trending_df = pd.DataFrame(trending_data)
-                trending_df = trending_df.sort_values('interest', ascending=False)
+            if not trending_df.empty:
                 df = pd.DataFrame(trending_df['keyword'].tolist(), columns=['keyword'])
                 print(f"✅ Successfully fetched {len(df)} trending keywords by interest")
                 print("Top trending by interest:")
@@ -93,12 +80,8 @@ def demo_reddit_scraping():
     """Demo function to test Reddit scraping"""
     print("\n📱 Testing Reddit scraping...")
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
         url = 'https://www.reddit.com/r/popular/'
-        response = requests.get(url, headers=headers, timeout=10)
+        response = polite_get(url)
         soup = BeautifulSoup(response.content, 'html.parser')
         
         # Try to find post titles
@@ -124,7 +107,7 @@ def demo_hackernews_scraping():
     print("\n💻 Testing Hacker News scraping...")
     try:
         url = 'https://news.ycombinator.com/'
-        response = requests.get(url, timeout=10)
+        response = polite_get(url)
         soup = BeautifulSoup(response.content, 'html.parser')
         
         # Find story titles
@@ -172,13 +155,6 @@ def demo_keyword_analysis():
         print(f"❌ Error analyzing keyword trends: {str(e)}")
         return pd.DataFrame()
 
-def extract_keywords_demo(text):
-    """Demo function for keyword extraction"""
-    stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-    words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-    keywords = [word for word in words if word not in stop_words]
-    return keywords
-
 def main():
     """Main demo function"""
     print("🌐 NetTrends Demo - Testing Core Functionality")
@@ -203,7 +179,7 @@ def main():
     if not reddit_data.empty:
         print("\n🔍 Keyword extraction demo:")
         sample_text = " ".join(reddit_data['title'].head(3).astype(str))
-        keywords = extract_keywords_demo(sample_text)
+        keywords = extract_keywords(sample_text)
         keyword_counts = Counter(keywords)
         print("Top extracted keywords:")
         for keyword, count in keyword_counts.most_common(5):
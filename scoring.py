@@ -0,0 +1,191 @@
+"""
+Cross-source trend scores with reciprocal-rank fusion and time decay.
+
+Every aggregated snapshot adds weight / (RRF_K + position) to each of its
+rows, where position is the row's place within its source: list position
+for search terms and titles, rank by mention count for extracted keywords
+and domains. So a #1 on Google and a most-mentioned word weigh the same, and
+appearing in more snapshots and sources adds up. A source only scores when
+its own rows differ from the last ones it scored, so a snapshot triggered by
+one source refreshing does not count the unchanged sources again.
+
+Scores decay exponentially with age. They are stored relative to a fixed
+reference time, so decay never reorders items and a snapshot only touches
+its own rows. Each (source, type) group keeps its items sorted by score, so
+the top K for any combination of sources and types is a k-way merge of the
+group lists instead of a sort of the whole table.
+"""
+
+import bisect
+import hashlib
+import heapq
+import math
+import threading
+import time
+from itertools import islice
+
+import pandas as pd
+
+RRF_K = 60
+HALF_LIFE_SECONDS = 6 * 3600
+# Rows ranked by a count rather than by position
+COUNT_TYPES = ('extracted_keyword', 'domain')
+# Rebase stored scores after this many half-lives so they stay well inside float range
+REBASE_HALF_LIVES = 100
+MIN_SCORE = 1e-6  # items that decayed below this are dropped when rebasing
+MAX_APPLIED_SNAPSHOTS = 1000
+
+
+def positions(aggregated):
+    """1-based position of every row within its source, best first"""
+    counted = aggregated['type'].isin(COUNT_TYPES)
+    # Higher counts first for counted rows, lower ranks first otherwise
+    order = aggregated['rank'].astype(float).where(~counted, -aggregated['rank'].astype(float))
+    return order.groupby(aggregated['source']).rank(method='first').astype(int)
+
+
+def _signature(rows):
+    """Content hash of one source's rows (keyword, type, position)"""
+    hashed = pd.util.hash_pandas_object(rows[['keyword', 'type', 'position']], index=False)
+    return hashlib.sha1(hashed.to_numpy().tobytes()).hexdigest()
+
+
+def _tagged(group, source, content_type):
+    for negative, keyword in group:
+        yield negative, keyword, source, content_type
+
+
+class TrendScores:
+    """Incrementally updated, time-decayed RRF scores with per-group top-K indexes"""
+
+    def __init__(self, half_life=HALF_LIFE_SECONDS, rrf_k=RRF_K, source_weights=None):
+        self.decay_rate = math.log(2) / half_life
+        self.half_life = half_life
+        self.rrf_k = rrf_k
+        self.source_weights = source_weights or {}
+        self._reference = None  # stored scores are worth score * exp(-rate * (now - reference))
+        self._items = {}  # (keyword, source, type) -> [stored score, last position]
+        self._groups = {}  # (source, type) -> list of (-stored score, keyword), ascending
+        self._applied = {}  # collected_at of applied snapshots, in insertion order
+        self._signatures = {}  # source -> signature of the rows it last scored
+        self._lock = threading.Lock()
+
+    def _apply(self, changed):
+        """Store new scores, keeping every group list sorted"""
+        by_group = {}
+        for key in changed:
+            by_group.setdefault(key[1:], []).append(key)
+        for group_key, keys in by_group.items():
+            group = self._groups.setdefault(group_key, [])
+            old = [(-self._items[key][0], key[0]) for key in keys if key in self._items]
+            new = [(-changed[key][0], key[0]) for key in keys]
+            if len(keys) * 8 > len(group):
+                # Large update: filtering and re-sorting beats many list inserts
+                removed = set(old)
+                group[:] = sorted([entry for entry in group if entry not in removed] + new)
+            else:
+                for entry in old:
+                    del group[bisect.bisect_left(group, entry)]
+                for entry in new:
+                    bisect.insort(group, entry)
+        for key, (stored, position) in changed.items():
+            self._items[key] = [stored, position]
+
+    def update(self, aggregated, collected_at=None):
+        """Add an aggregated snapshot; snapshots already applied are ignored
+
+        Only sources whose rows changed since they were last scored add to
+        the scores. Returns whether any rows were scored.
+        """
+        collected_at = collected_at or time.time()
+        # History keeps whole seconds, so key snapshots by those
+        snapshot_key = int(collected_at)
+        # Reruns see the same snapshot again and again; skip them before any per-row work
+        with self._lock:
+            if snapshot_key in self._applied:
+                return False
+        if aggregated.empty:
+            return False
+        rows = aggregated.assign(
+            keyword=aggregated['keyword'].astype(str), source=aggregated['source'].astype(str),
+            type=aggregated['type'].astype(str), position=positions(aggregated)
+        )
+        # Like any ranked list in RRF, a source counts each item once, at its best position
+        rows = rows.sort_values('position', kind='stable').drop_duplicates(['keyword', 'source', 'type'])
+        signatures = {
+            source: _signature(group.sort_values(['position', 'type', 'keyword'], kind='stable'))
+            for source, group in rows.groupby('source', sort=False)
+        }
+
+        with self._lock:
+            # Another thread may have applied it meanwhile
+            if snapshot_key in self._applied:
+                return False
+            self._applied[snapshot_key] = True
+            while len(self._applied) > MAX_APPLIED_SNAPSHOTS:
+                del self._applied[next(iter(self._applied))]
+
+            changed_sources = {source for source, signature in signatures.items()
+                               if self._signatures.get(source) != signature}
+            if not changed_sources:
+                return False
+            for source in changed_sources:
+                self._signatures[source] = signatures[source]
+            rows = rows[rows['source'].isin(changed_sources)]
+
+            if self._reference is None:
+                self._reference = collected_at
+            elif collected_at - self._reference > REBASE_HALF_LIVES * self.half_life:
+                self._rebase(collected_at)
+            growth = math.exp(self.decay_rate * (collected_at - self._reference))
+
+            changed = {}
+            for keyword, source, content_type, position in zip(rows['keyword'], rows['source'], rows['type'], rows['position']):
+                key = (keyword, source, content_type)
+                contribution = self.source_weights.get(source, 1.0) / (self.rrf_k + position) * growth
+                previous = self._items.get(key)
+                changed[key] = ((previous[0] if previous else 0.0) + contribution, position)
+            self._apply(changed)
+        return True
+
+    def _rebase(self, now):
+        """Move the reference time to now, dropping items that decayed to nothing"""
+        factor = math.exp(-self.decay_rate * (now - self._reference))
+        self._reference = now
+        self._items = {key: [stored * factor, position] for key, (stored, position) in self._items.items()
+                       if stored * factor >= MIN_SCORE}
+        self._groups = {}
+        for key, (stored, _) in self._items.items():
+            self._groups.setdefault(key[1:], []).append((-stored, key[0]))
+        for group in self._groups.values():
+            group.sort()
+
+    def top(self, k=20, sources=None, types=None, now=None):
+        """Highest scored items among the given sources and types, with scores decayed to now"""
+        columns = ['keyword', 'source', 'type', 'position', 'score']
+        with self._lock:
+            if self._reference is None:
+                return pd.DataFrame(columns=columns)
+            groups = [
+                _tagged(group, source, content_type)
+                for (source, content_type), group in self._groups.items()
+                if (sources is None or source in sources) and (types is None or content_type in types)
+            ]
+            # Each group is already sorted, so only about k entries are ever looked at
+            best = list(islice(heapq.merge(*groups), k))
+            decay = math.exp(-self.decay_rate * ((now or time.time()) - self._reference))
+            rows = [
+                (keyword, source, content_type, self._items[(keyword, source, content_type)][1], -negative * decay)
+                for negative, keyword, source, content_type in best
+            ]
+        return pd.DataFrame(rows, columns=columns)
+
+    def warm_from_history(self, history):
+        """Replay stored snapshots (a HistoryStore.query frame) oldest first"""
+        if history.empty:
+            return
+        for collected_at, snapshot in history.groupby('collected_at', sort=True):
+            self.update(snapshot, collected_at.timestamp())
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,304 @@
+"""
+NetTrends data sources.
+
+Fetch functions for Google Trends, Reddit and Hacker News, the source
+registry that plugins add themselves to, and a scheduler that fetches any
+number of sources under one concurrency cap with per-source deadlines.
+Nothing here depends on Streamlit, so the dashboard and the headless
+collector share it.
+"""
+
+import importlib
+import logging
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import pandas as pd
+
+from hackernews_api import fetch_hackernews_api
+from html_parsing import parse_hackernews_stories, parse_reddit_titles
+from http_client import TokenBucket
+from reddit_api import REDDIT_BASE_URL, fetch_reddit_api
+from response_store import fetch_parsed
+from trends_batching import fetch_batched_interest, summarize_interest
+from trends_client import TrendsUnavailable, trends_client
+from trends_regions import REGION_CACHE_KEY, REGION_TTL, TRENDS_COLUMNS, fetch_trending_regions, merge_regions
+
+logger = logging.getLogger(__name__)
+
+def fetch_google_trends(limiter=None):
+    """Fetch trending searches for every configured region from Google Trends
+
+    Regions are fetched concurrently and cached one by one (see
+    trends_regions), so only expired regions are requested again. Requests
+    are paced by the shared Trends client rather than `limiter`. While Google
+    is throttling us this returns an empty frame right away, which leaves the
+    cached snapshot in place.
+    """
+    empty = pd.DataFrame(columns=TRENDS_COLUMNS)
+    df = fetch_trending_regions()
+    if not df.empty:
+        return df
+
+    if not trends_client.available():
+        logger.warning(f"Skipping Google Trends, still throttled: {trends_client.quota_state()}")
+        return empty
+    try:
+        # Fallback: score a set of popular keywords by their current worldwide interest
+        popular_keywords = [
+            'AI', 'Bitcoin', 'Tesla', 'iPhone', 'Netflix', 'Amazon', 'Google',
+            'Facebook', 'Twitter', 'TikTok', 'YouTube', 'Instagram', 'WhatsApp',
+            'COVID', 'Ukraine', 'Climate', 'NFT', 'Crypto', 'Stock', 'Weather'
+        ]
+        
+        # Score every keyword with anchored 5-term payloads instead of one request per keyword
+        pytrends = trends_client.session()
+        interest = fetch_batched_interest(pytrends, popular_keywords, timeframe='now 1-d')
+        trending_df = summarize_interest(interest)
+        
+        if not trending_df.empty:
+            ranked = pd.DataFrame({'keyword': trending_df['keyword'], 'rank': range(1, len(trending_df) + 1)})
+            return merge_regions({'worldwide': ranked})
+        
+        # If all methods fail, return empty DataFrame
+        logger.error("Unable to fetch Google Trends data. This may be due to API rate limiting or connectivity issues.")
+        return empty
+        
+    except TrendsUnavailable as e:
+        logger.warning(f"Google Trends is throttling requests, keeping cached data: {str(e)}")
+        return empty
+    except Exception as e:
+        logger.error(f"Error connecting to Google Trends: {str(e)}")
+        return empty
+
+# Subreddits read for trending posts; fetched concurrently under the source's rate limiter
+REDDIT_SUBREDDITS = ['popular', 'all', 'news', 'technology']
+REDDIT_MAX_WORKERS = 8
+
+def fetch_subreddit_titles(subreddit, limiter=None):
+    """Fetch post titles from a single subreddit, reusing the last parse if the page is unchanged"""
+    try:
+        return fetch_parsed(f'{REDDIT_BASE_URL}/r/{subreddit}/', parse_reddit_titles, limiter=limiter)
+    except Exception as e:
+        return []
+
+def scrape_reddit_front_pages(limiter=None):
+    """Scrape trending post titles from the subreddit front pages"""
+    # Fetch all subreddits in parallel; ordering of the results follows REDDIT_SUBREDDITS
+    with ThreadPoolExecutor(max_workers=min(REDDIT_MAX_WORKERS, len(REDDIT_SUBREDDITS))) as executor:
+        per_subreddit = list(executor.map(lambda subreddit: fetch_subreddit_titles(subreddit, limiter), REDDIT_SUBREDDITS))
+    all_titles = [title for titles in per_subreddit for title in titles]
+    
+    df = pd.DataFrame(all_titles[:30], columns=['keyword'])  # Top 30 posts
+    df['source'] = 'Reddit'
+    df['rank'] = range(1, len(df) + 1)
+    return df
+
+POST_COLUMNS = ['keyword', 'source', 'rank', 'url', 'score', 'comments']
+
+# 'api' pages through the .json listings with scores and links, 'scrape' reads the HTML front pages
+REDDIT_MODE = os.environ.get('NETTRENDS_REDDIT_MODE', 'api')
+
+def fetch_reddit_trends(limiter=None):
+    """Fetch trending posts from Reddit, falling back to scraping if the listings fail"""
+    if REDDIT_MODE == 'api':
+        try:
+            df = fetch_reddit_api(REDDIT_SUBREDDITS, limiter=limiter, max_workers=REDDIT_MAX_WORKERS)
+            if not df.empty:
+                return df
+        except Exception as e:
+            logger.warning(f"Reddit listings unavailable, scraping the front pages instead: {str(e)}")
+    try:
+        return scrape_reddit_front_pages(limiter).reindex(columns=POST_COLUMNS)
+    except Exception as e:
+        logger.error(f"Error fetching Reddit data: {str(e)}")
+        return pd.DataFrame(columns=POST_COLUMNS)
+
+# Ask HN and other text posts link to item?id=... relative to the front page
+HN_FRONT_PAGE = os.environ.get('NETTRENDS_HN_FRONT_PAGE', 'https://news.ycombinator.com/')
+
+def scrape_hackernews_front_page(limiter=None):
+    """Scrape trending stories from the Hacker News front page"""
+    stories = fetch_parsed(HN_FRONT_PAGE, parse_hackernews_stories, limiter=limiter)
+    
+    df = pd.DataFrame({
+        'keyword': [title for title, _ in stories[:30]],  # Top 30 stories
+        'url': [url for _, url in stories[:30]]
+    })
+    df['source'] = 'Hacker News'
+    df['rank'] = range(1, len(df) + 1)
+    return df
+
+# 'api' reads hundreds of stories with scores from the official API, 'scrape' only the front page
+HN_MODE = os.environ.get('NETTRENDS_HN_MODE', 'api')
+
+def fetch_hackernews_trends(limiter=None):
+    """Fetch trending stories from Hacker News, falling back to scraping if the API fails"""
+    if HN_MODE == 'api':
+        try:
+            df = fetch_hackernews_api(limiter=limiter)
+            if not df.empty:
+                return df
+        except Exception as e:
+            logger.warning(f"Hacker News API unavailable, scraping the front page instead: {str(e)}")
+    try:
+        return scrape_hackernews_front_page(limiter).reindex(columns=POST_COLUMNS)
+    except Exception as e:
+        logger.error(f"Error fetching Hacker News data: {str(e)}")
+        return pd.DataFrame(columns=POST_COLUMNS)
+
+# Source plugins
+
+BASE_COLUMNS = ['keyword', 'source', 'rank']
+
+# How many sources may be fetched at the same time, across all plugins
+MAX_CONCURRENT_SOURCES = int(os.environ.get('NETTRENDS_MAX_CONCURRENT_SOURCES', '4'))
+# How often the scheduler checks on sources still waiting for a free slot
+QUEUE_POLL_SECONDS = 0.25
+# The collector refreshes a source once this fraction of its TTL has passed, so readers never see it expire
+REFRESH_FRACTION = 0.8
+
+class Source:
+    """A pluggable trend source.
+
+    fetch(limiter=None) returns a DataFrame with the declared columns (at least
+    keyword/source/rank; a 'url' column feeds the domain counts, with relative
+    links resolved against base_url). content_type
+    tells the aggregator whether rows are search terms ('keyword') or titles
+    to extract keywords from ('post_title'). ttl is the cache lifetime,
+    deadline the per-fetch timeout in seconds, and rate_limit/burst the
+    requests per second the fetch may make (or pass a shared limiter).
+    related_cache_keys are other cache keys the fetch reads from, which an
+    explicit refresh invalidates along with the source.
+    A source's own limit replaces the global politeness limit; it can be
+    overridden with NETTRENDS_<KEY>_REQUESTS_PER_SECOND and
+    NETTRENDS_<KEY>_REQUEST_BURST. Sources without one share the global limit.
+    """
+
+    def __init__(self, key, name, fetch, content_type='post_title', columns=BASE_COLUMNS,
+                 ttl=3600, deadline=30, rate_limit=None, burst=1, limiter=None, label=None, base_url=None,
+                 related_cache_keys=()):
+        self.key = key
+        self.name = name
+        self.fetch = fetch
+        self.content_type = content_type
+        self.columns = list(columns)
+        self.ttl = ttl
+        self.deadline = deadline
+        prefix = f'NETTRENDS_{key.upper()}_'
+        rate_limit = float(os.environ.get(prefix + 'REQUESTS_PER_SECOND', rate_limit or 0)) or None
+        burst = int(os.environ.get(prefix + 'REQUEST_BURST', burst))
+        self.limiter = limiter or (TokenBucket(rate_limit, burst) if rate_limit else None)
+        self.label = label or name
+        self.base_url = base_url
+        self.related_cache_keys = tuple(related_cache_keys)
+
+    def run(self):
+        """Fetch this source under its own rate limit"""
+        return self.fetch(limiter=self.limiter)
+
+    def empty_frame(self):
+        return pd.DataFrame(columns=self.columns)
+
+
+SOURCE_REGISTRY = {}
+_loaded_plugins = set()
+
+def register_source(source):
+    """Add a source to the registry (replacing any source with the same key)"""
+    SOURCE_REGISTRY[source.key] = source
+    return source
+
+def load_plugins():
+    """Import the plugin modules listed in NETTRENDS_SOURCE_PLUGINS (comma separated)
+
+    Plugin modules register their sources with register_source() when imported.
+    """
+    for module_name in os.environ.get('NETTRENDS_SOURCE_PLUGINS', '').split(','):
+        module_name = module_name.strip()
+        if module_name and module_name not in _loaded_plugins:
+            try:
+                importlib.import_module(module_name)
+            except Exception as e:
+                logger.error(f"Could not load source plugin {module_name}: {str(e)}")
+            _loaded_plugins.add(module_name)
+
+def registered_sources():
+    """All registered sources, built-ins first"""
+    load_plugins()
+    return list(SOURCE_REGISTRY.values())
+
+
+register_source(Source(
+    'google_trends', 'Google Trends', fetch_google_trends, content_type='keyword', columns=TRENDS_COLUMNS,
+    # Every region has expired by the time the collector refreshes the merged snapshot,
+    # so a refresh never re-stores cached regions under a new fetch time
+    ttl=math.ceil(REGION_TTL / REFRESH_FRACTION), deadline=45, related_cache_keys=[REGION_CACHE_KEY]
+))
+register_source(Source(
+    'reddit', 'Reddit', fetch_reddit_trends, label='Reddit Posts', columns=POST_COLUMNS,
+    ttl=1800, deadline=30, rate_limit=2, burst=4
+))
+register_source(Source(
+    'hackernews', 'Hacker News', fetch_hackernews_trends, columns=POST_COLUMNS, base_url=HN_FRONT_PAGE,
+    ttl=900, deadline=30, rate_limit=50, burst=50
+))
+
+
+def run_sources(sources, load=None, on_result=None, max_concurrency=None):
+    """Fetch sources in parallel under a global concurrency cap, each bounded by its own deadline.
+
+    load(source) returns the source's DataFrame (default: source.run()). A
+    source's deadline starts when it actually starts running, not while it
+    waits for a free slot. on_result(source, df, error) is called from the
+    calling thread as soon as a source finishes, fails or misses its deadline
+    (error is None on success), so callers can show partial results.
+    Returns a dict of source key -> DataFrame; failed sources get an empty frame.
+    """
+    load = load or (lambda source: source.run())
+    max_concurrency = max_concurrency or MAX_CONCURRENT_SOURCES
+    results = {}
+    started_at = {}
+
+    def run(source):
+        started_at[source.key] = time.monotonic()
+        return load(source)
+
+    def finish(source, df, error):
+        results[source.key] = df
+        if on_result:
+            on_result(source, df, error)
+
+    workers = max(1, min(max_concurrency, len(sources)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='nettrends-fetch')
+    try:
+        pending = {executor.submit(run, source): source for source in sources}
+
+        while pending:
+            now = time.monotonic()
+            deadlines = [started_at[source.key] + source.deadline for source in pending.values() if source.key in started_at]
+            timeout = None if len(deadlines) == len(pending) else QUEUE_POLL_SECONDS
+            if deadlines:
+                until_deadline = max(0, min(deadlines) - now)
+                timeout = until_deadline if timeout is None else min(timeout, until_deadline)
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                source = pending.pop(future)
+                try:
+                    finish(source, future.result(), None)
+                except Exception as e:
+                    finish(source, source.empty_frame(), f"Error fetching {source.name} data: {str(e)}")
+
+            # Give up on sources that ran past their deadline; a late result still
+            # lands in the cache and is picked up next time
+            now = time.monotonic()
+            for future, source in list(pending.items()):
+                if source.key in started_at and now >= started_at[source.key] + source.deadline:
+                    del pending[future]
+                    finish(source, source.empty_frame(), f"{source.name} is taking too long to respond")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
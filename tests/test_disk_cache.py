@@ -0,0 +1,128 @@
+"""Disk cache refreshes: invalidation, failures and backoff."""
+
+import time
+
+import pandas as pd
+import pytest
+
+import disk_cache
+from disk_cache import DiskCache, FetchBackoff
+
+OLD = pd.DataFrame({'keyword': ['old']})
+NEW = pd.DataFrame({'keyword': ['new']})
+EMPTY = pd.DataFrame({'keyword': []})
+
+
+class Fetcher:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DiskCache(str(tmp_path / 'cache.sqlite'))
+
+
+def test_fresh_entries_are_served_without_fetching(cache):
+    cache.put('hn', OLD)
+    fetch = Fetcher()
+
+    assert cache.get_or_fetch('hn', fetch, ttl=60).equals(OLD)
+    assert fetch.calls == 0
+
+
+def test_invalidated_entry_is_refetched_on_the_next_read(cache):
+    cache.put('hn', OLD)
+    cache.invalidate('hn')
+    fetch = Fetcher(NEW)
+
+    assert cache.get_or_fetch('hn', fetch, ttl=60).equals(NEW)
+    assert cache.get('hn')[0].equals(NEW)
+    assert cache.get_or_fetch('hn', fetch, ttl=60).equals(NEW)
+    assert fetch.calls == 1
+
+
+@pytest.mark.parametrize('failure', [EMPTY, ConnectionError('down')])
+def test_invalidated_entry_survives_a_failed_refetch(cache, failure):
+    cache.put('hn', OLD)
+    cache.invalidate('hn')
+    fetch = Fetcher(failure)
+
+    assert cache.get_or_fetch('hn', fetch, ttl=60).equals(OLD)
+    assert cache.get('hn')[0].equals(OLD)
+    # Backing off: later reads serve the old value without fetching
+    assert cache.get_or_fetch('hn', fetch, ttl=60).equals(OLD)
+    assert fetch.calls == 1
+
+
+def test_failed_fetch_without_an_entry_backs_off(cache):
+    fetch = Fetcher(ConnectionError('down'), NEW)
+
+    with pytest.raises(ConnectionError):
+        cache.get_or_fetch('hn', fetch, ttl=60)
+    with pytest.raises(FetchBackoff) as backoff:
+        cache.get_or_fetch('hn', fetch, ttl=60)
+
+    assert fetch.calls == 1
+    assert 0 < backoff.value.retry_in <= disk_cache.FAILURE_BACKOFF_SECONDS
+
+
+def test_empty_results_are_not_cached_and_back_off(cache):
+    fetch = Fetcher(EMPTY, NEW)
+
+    assert cache.get_or_fetch('hn', fetch, ttl=60).empty
+    assert cache.get('hn') is None
+    with pytest.raises(FetchBackoff):
+        cache.get_or_fetch('hn', fetch, ttl=60)
+    assert fetch.calls == 1
+
+
+def test_fetch_is_retried_once_the_backoff_passed(cache, monkeypatch):
+    monkeypatch.setattr(disk_cache, 'FAILURE_BACKOFF_SECONDS', 0.05)
+    fetch = Fetcher(EMPTY, NEW)
+    cache.get_or_fetch('hn', fetch, ttl=60)
+
+    time.sleep(0.06)
+
+    assert cache.get_or_fetch('hn', fetch, ttl=60).equals(NEW)
+    assert fetch.calls == 2
+
+
+def test_backoff_doubles_with_every_failure(cache):
+    cache._record_failure('hn', 'default')
+    first = cache._state('hn', 'default')[1] - time.time()
+    cache._record_failure('hn', 'default')
+    second = cache._state('hn', 'default')[1] - time.time()
+
+    assert second == pytest.approx(2 * first, rel=0.05)
+
+
+def test_invalidate_clears_the_backoff(cache):
+    cache.put('hn', OLD)
+    cache.invalidate('hn')
+    cache.get_or_fetch('hn', Fetcher(EMPTY), ttl=60)
+
+    cache.invalidate('hn')
+    fetch = Fetcher(NEW)
+
+    assert cache.get_or_fetch('hn', fetch, ttl=60).equals(NEW)
+
+
+def test_invalidate_covers_every_window_unless_one_is_given(cache):
+    cache.put('trends', OLD, 'a')
+    cache.put('trends', OLD, 'b')
+
+    cache.invalidate('trends', 'a')
+    assert cache._state('trends', 'a')[0] and not cache._state('trends', 'b')[0]
+
+    cache.invalidate('trends')
+    assert cache._state('trends', 'b')[0]
+    assert cache.get('trends', 'b')[0].equals(OLD)
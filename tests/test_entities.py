@@ -0,0 +1,46 @@
+"""Keyword canonicalization and entity merging."""
+
+import pandas as pd
+import pytest
+
+from entities import canonical_form, merge_entities
+
+
+def aggregated(*keywords):
+    return pd.DataFrame({
+        'keyword': list(keywords),
+        'source': ['Google Trends'] * len(keywords),
+        'rank': range(1, len(keywords) + 1),
+        'type': 'keyword',
+    })
+
+
+def entity_groups(*keywords):
+    merged = merge_entities(aggregated(*keywords))
+    return sorted(sorted(variants.split(', ')) for variants in merged['variants'])
+
+
+@pytest.mark.parametrize('singular, plural', [
+    ('movie', 'movies'), ('cookie', 'cookies'), ('cache', 'caches'), ('size', 'sizes'), ('gas', 'gases'),
+    ('story', 'stories'), ('startup', 'startups'), ('box', 'boxes'), ('class', 'classes'),
+])
+def test_singular_and_plural_merge(singular, plural):
+    assert entity_groups(singular, plural) == [sorted([singular, plural])]
+
+
+@pytest.mark.parametrize('first, second', [('Canva', 'canvas'), ('len', 'lens'), ('panda', 'pandas'), ('new', 'news')])
+def test_words_that_only_look_plural_stay_apart(first, second):
+    assert entity_groups(first, second) == [[first], [second]]
+
+
+def test_plural_without_its_singular_is_kept_as_is():
+    assert canonical_form('Movies') == 'movies'
+    assert canonical_form('Movies', {'movie'}) == 'movie'
+
+
+def test_spacing_and_possessives_are_ignored():
+    assert entity_groups("OpenAI's", 'Open AI') == [["Open AI", "OpenAI's"]]
+
+
+def test_numbers_keep_keywords_apart():
+    assert entity_groups('iphone 15', 'iphone 16') == [['iphone 15'], ['iphone 16']]
@@ -0,0 +1,204 @@
+"""Hacker News API ingestion, run against a local stub of the Firebase API."""
+
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import hackernews_api
+from http_client import TokenBucket
+
+
+class StubHN:
+    """Serves story lists, updates and items from dicts and counts item requests"""
+
+    def __init__(self):
+        self.lists = {}
+        self.items = {}
+        self.updates = []
+        self.item_requests = Counter()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.strip('/')
+                if path == 'updates.json':
+                    body = {'items': stub.updates, 'profiles': []}
+                elif path.startswith('item/'):
+                    item_id = int(path[len('item/'):-len('.json')])
+                    stub.item_requests[item_id] += 1
+                    body = stub.items.get(item_id)
+                else:
+                    body = stub.lists.get(path[:-len('.json')])
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def story(item_id, score=10, comments=0, **fields):
+    item = {'id': item_id, 'type': 'story', 'title': f'Story number {item_id} title',
+            'url': f'https://example{item_id}.com/post', 'score': score, 'descendants': comments}
+    item.update(fields)
+    return item
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = StubHN()
+    monkeypatch.setattr(hackernews_api, 'HN_API_BASE', server.base_url)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return hackernews_api.ItemCache(str(tmp_path / 'hn_items.sqlite'))
+
+
+@pytest.fixture
+def limiter():
+    return TokenBucket(1000, 1000)
+
+
+def fetch(cache, limiter, lists=('topstories',)):
+    return hackernews_api.fetch_hackernews_api(limiter, list(lists), cache=cache)
+
+
+def test_fetches_stories_with_scores_and_comments(stub, cache, limiter):
+    stub.lists['topstories'] = [1, 2, 3]
+    stub.items = {1: story(1, score=50, comments=7), 2: story(2, score=5, comments=1, url=None),
+                  3: story(3, score=20, comments=3)}
+
+    df = fetch(cache, limiter)
+
+    assert list(df.columns) == ['keyword', 'source', 'rank', 'url', 'score', 'comments']
+    assert (df['source'] == 'Hacker News').all()
+    row = df.set_index('url').loc['https://example1.com/post']
+    assert (row['score'], row['comments']) == (50, 7)
+    # Text posts link to their discussion
+    assert 'item?id=2' in df['url'].tolist()
+
+
+def test_skips_deleted_dead_and_non_story_items(stub, cache, limiter):
+    stub.lists['topstories'] = [1, 2, 3, 4, 5]
+    stub.items = {1: story(1), 2: story(2, deleted=True), 3: story(3, dead=True),
+                  4: story(4, type='job'), 5: story(5, title='Too short')}
+
+    df = fetch(cache, limiter)
+
+    assert df['url'].tolist() == ['https://example1.com/post']
+
+
+def test_score_and_comments_rank_stories(stub, cache, limiter):
+    stub.lists['topstories'] = [1, 2, 3]
+    stub.items = {1: story(1, score=3, comments=0), 2: story(2, score=40, comments=25),
+                  3: story(3, score=400, comments=300)}
+
+    df = fetch(cache, limiter)
+
+    assert df['rank'].tolist() == [1, 2, 3]
+    assert df['url'].tolist() == [f'https://example{i}.com/post' for i in (3, 2, 1)]
+
+
+def test_equal_engagement_keeps_list_order(stub, cache, limiter):
+    stub.lists['topstories'] = [3, 1, 2]
+    stub.items = {i: story(i, score=10, comments=2) for i in (1, 2, 3)}
+
+    df = fetch(cache, limiter)
+
+    assert df['url'].tolist() == [f'https://example{i}.com/post' for i in (3, 1, 2)]
+
+
+def test_merges_lists_without_duplicates(stub, cache, limiter):
+    stub.lists = {'topstories': [1, 2], 'beststories': [2, 3]}
+    stub.items = {i: story(i) for i in (1, 2, 3)}
+
+    df = fetch(cache, limiter, lists=('topstories', 'beststories'))
+
+    assert len(df) == 3
+    assert stub.item_requests == Counter({1: 1, 2: 1, 3: 1})
+
+
+def test_cached_items_are_only_refetched_when_updated(stub, cache, limiter):
+    stub.lists['topstories'] = [1, 2]
+    stub.items = {1: story(1, score=10), 2: story(2, score=10)}
+    fetch(cache, limiter)
+
+    stub.items[2] = story(2, score=99)
+    stub.updates = [2]
+    df = fetch(cache, limiter)
+
+    assert stub.item_requests == Counter({1: 1, 2: 2})
+    assert df.set_index('url').loc['https://example2.com/post', 'score'] == 99
+
+
+def test_stale_cached_items_are_refetched(stub, cache, limiter, monkeypatch):
+    stub.lists['topstories'] = [1]
+    stub.items = {1: story(1)}
+    fetch(cache, limiter)
+
+    monkeypatch.setattr(hackernews_api, 'HN_ITEM_TTL', 0)
+    fetch(cache, limiter)
+
+    assert stub.item_requests[1] == 2
+
+
+def test_expire_drops_old_items(cache):
+    cache.put_many([story(1)])
+    assert cache.get_many([1])
+
+    cache.expire(max_age=60)
+    assert cache.get_many([1])
+
+    time.sleep(0.01)
+    cache.expire(max_age=0)
+    assert cache.get_many([1]) == {}
+
+
+def test_fetching_expires_old_items(stub, cache, limiter):
+    stub.lists['topstories'] = [1]
+    stub.items = {1: story(1)}
+    fetch(cache, limiter)
+    with cache._connect() as conn:
+        conn.execute('UPDATE hn_items SET fetched_at = ?', (time.time() - hackernews_api.HN_ITEM_RETENTION - 1,))
+
+    stub.lists['topstories'] = [2]
+    stub.items[2] = story(2)
+    fetch(cache, limiter)
+
+    assert cache.get_many([1]) == {}
+    assert cache.get_many([2])
+
+
+def test_items_are_yielded_a_chunk_at_a_time(stub, cache, limiter):
+    stub.items = {item_id: story(item_id) for item_id in range(1, 11)}
+
+    items = hackernews_api.iter_items(list(range(1, 11)), limiter, cache, chunk_size=4)
+    first = next(items)
+
+    assert first['id'] == 1
+    assert sum(stub.item_requests.values()) == 4
+    assert [item['id'] for item in items] == list(range(2, 11))
+    assert sum(stub.item_requests.values()) == 10
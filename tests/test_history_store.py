@@ -0,0 +1,63 @@
+"""Parquet history: appends, de-duplication and compaction."""
+
+from datetime import datetime, timezone
+
+import pandas as pd
+import pytest
+
+from history_store import HistoryStore
+
+DAY1 = datetime(2026, 3, 1, 12, tzinfo=timezone.utc).timestamp()
+DAY2 = datetime(2026, 3, 2, 0, 5, tzinfo=timezone.utc).timestamp()
+
+
+def snapshot(*keywords):
+    return pd.DataFrame({
+        'keyword': list(keywords), 'source': 'Reddit', 'type': 'extracted_keyword',
+        'rank': range(len(keywords), 0, -1),
+    })
+
+
+@pytest.fixture
+def history(tmp_path):
+    return HistoryStore(str(tmp_path / 'history'))
+
+
+def query_all(history):
+    return history.query(start=datetime(2026, 3, 1, tzinfo=timezone.utc), end=datetime(2026, 3, 3, tzinfo=timezone.utc))
+
+
+def test_same_snapshot_is_stored_once(history):
+    assert history.append(snapshot('rust'), DAY1, 's1')
+    assert not history.append(snapshot('rust'), DAY1, 's1')
+    assert len(query_all(history)) == 1
+
+
+def test_compacted_snapshots_are_not_appended_again(history):
+    history.append(snapshot('rust'), DAY1, 's1')
+    history.append(snapshot('python', 'go'), DAY1 + 60, 's2')
+
+    assert history.compact_before(DAY2) == ['2026-03-01']
+    assert history.has_snapshot('s1', DAY1)
+    assert not history.append(snapshot('rust'), DAY1, 's1')
+    assert len(query_all(history)) == 3
+
+
+def test_compacting_again_keeps_earlier_snapshot_ids(history):
+    history.append(snapshot('rust'), DAY1, 's1')
+    history.append(snapshot('go'), DAY1 + 60, 's2')
+    history.compact_before(DAY2)
+    # A late snapshot lands in the compacted day and gets merged in turn
+    history.append(snapshot('zig'), DAY1 + 120, 's3')
+    history.compact_before(DAY2)
+
+    for snapshot_id in ('s1', 's2', 's3'):
+        assert history.has_snapshot(snapshot_id, DAY1)
+    assert sorted(query_all(history)['keyword']) == ['go', 'rust', 'zig']
+
+
+def test_today_is_not_compacted(history):
+    history.append(snapshot('rust'), DAY2, 's1')
+    history.append(snapshot('go'), DAY2 + 60, 's2')
+
+    assert history.compact_before(DAY2) == []
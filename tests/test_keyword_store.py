@@ -0,0 +1,100 @@
+"""Rolling keyword counts: per-snapshot merges, expiry and rising keywords."""
+
+import time
+
+import pandas as pd
+import pytest
+
+import keyword_store
+from disk_cache import DiskCache
+from keyword_store import KeywordCountStore, merge_source_keywords
+
+HOUR = 3600
+
+
+@pytest.fixture
+def store(tmp_path):
+    return KeywordCountStore(str(tmp_path / 'counts.sqlite'))
+
+
+class FakeSource:
+    key = 'reddit'
+    name = 'Reddit'
+    content_type = 'post_title'
+
+
+def counts(store, now):
+    top = store.top(hours=24, now=now)
+    return dict(zip(top['keyword'], top['count']))
+
+
+def test_titles_are_counted_once(store):
+    now = time.time()
+    assert store.merge_titles('Reddit', ['Rust compiler released'], now=now) == 1
+    assert store.merge_titles('Reddit', ['Rust compiler released', 'Rust in Linux'], now=now) == 1
+
+    assert counts(store, now) == {'rust': 2, 'compiler': 1, 'released': 1, 'linux': 1}
+
+
+def test_a_snapshot_is_merged_once(store, monkeypatch):
+    now = time.time()
+    assert store.merge_snapshot('Reddit', ['Rust compiler released'], now) == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError('snapshot merged twice')
+    monkeypatch.setattr(store, 'merge_titles', fail)
+
+    assert store.merge_snapshot('Reddit', ['Rust compiler released', 'Python news'], now) == 0
+
+
+def test_merged_snapshots_are_shared_between_workers(store, tmp_path):
+    now = time.time()
+    store.merge_snapshot('Reddit', ['Rust compiler released'], now)
+    other = KeywordCountStore(store.path)
+
+    assert other.has_merged('Reddit', now)
+    assert other.merge_titles('Reddit', ['Python news'], now=now, fetched_at=now) == 0
+
+
+def test_merge_source_keywords_reads_the_cached_snapshot_once(store, tmp_path):
+    cache = DiskCache(str(tmp_path / 'cache.sqlite'))
+    cache.put('reddit', pd.DataFrame({'keyword': ['Rust compiler released']}))
+
+    assert merge_source_keywords(cache, store, FakeSource()) == 1
+    assert merge_source_keywords(cache, store, FakeSource()) == 0
+
+    cache.put('reddit', pd.DataFrame({'keyword': ['Rust compiler released', 'Python tooling']}))
+    assert merge_source_keywords(cache, store, FakeSource()) == 1
+
+
+def test_expiry_runs_once_per_bucket(store, monkeypatch):
+    calls = []
+    original = store.expire
+    monkeypatch.setattr(store, 'expire', lambda now=None: calls.append(now) or original(now))
+    now = time.time()
+
+    for i in range(5):
+        store.merge_titles('Reddit', [f'Title number {i} here'], now=now)
+
+    assert len(calls) == 1
+
+
+def test_old_buckets_expire(store):
+    now = time.time()
+    old = now - keyword_store.RETENTION_SECONDS - 2 * HOUR
+    store.merge_snapshot('Reddit', ['Ancient history title'], old)
+
+    store.expire(now)
+
+    assert counts(store, old) == {}
+    assert not store.has_merged('Reddit', old)
+
+
+def test_rising_compares_with_the_window_before(store):
+    now = time.time()
+    store.merge_titles('Reddit', ['Rust compiler'], now=now - HOUR)
+    store.merge_titles('Reddit', ['Rust news today', 'Rust again now', 'Compiler bugs'], now=now)
+
+    rising = store.rising(hours=1, now=now).set_index('keyword')
+
+    assert rising.loc['rust', 'recent'] == 2 and rising.loc['rust', 'previous'] == 1
@@ -0,0 +1,67 @@
+"""Streaming helpers: records_to_frame and iter_parallel."""
+
+import threading
+
+from pipeline import iter_parallel, records_to_frame
+
+
+def test_records_to_frame_fills_columns():
+    df = records_to_frame(iter([{'a': 1, 'b': 'x'}, {'a': 2}]), ['a', 'b'])
+
+    assert df['a'].tolist() == [1, 2]
+    assert df['b'].tolist()[0] == 'x'
+
+
+def test_iter_parallel_keeps_producer_order():
+    producers = [lambda n=n: (f'{n}-{i}' for i in range(3)) for n in range(4)]
+
+    assert list(iter_parallel(producers, max_workers=2, buffer=1)) == [f'{n}-{i}' for n in range(4) for i in range(3)]
+
+
+def test_iter_parallel_bounds_how_far_producers_run_ahead():
+    produced = []
+    release_first = threading.Event()
+
+    def first():
+        yield 'a'
+        release_first.wait(5)
+
+    def second():
+        for i in range(100):
+            produced.append(i)
+            yield i
+
+    items = iter_parallel([first, second], max_workers=2, buffer=2)
+    assert next(items) == 'a'
+    threading.Event().wait(0.3)
+    # Two items queued plus the one blocked on put
+    assert len(produced) <= 3
+    release_first.set()
+    assert list(items) == list(range(100))
+
+
+def test_iter_parallel_keeps_items_of_a_failed_producer():
+    def failing():
+        yield 1
+        raise RuntimeError('page 2 failed')
+
+    assert list(iter_parallel([failing, lambda: iter([2])], max_workers=2, buffer=1)) == [1, 2]
+
+
+def test_iter_parallel_stops_producers_when_closed_early():
+    stopped = threading.Event()
+
+    def endless():
+        try:
+            i = 0
+            while True:
+                yield i
+                i += 1
+        finally:
+            stopped.set()
+
+    items = iter_parallel([endless], max_workers=1, buffer=1)
+    assert next(items) == 0
+    items.close()
+
+    assert stopped.wait(5)
@@ -0,0 +1,59 @@
+"""Incremental, time-decayed trend scores."""
+
+import pandas as pd
+import pytest
+
+import scoring
+from scoring import TrendScores
+
+
+def snapshot(trends, reddit):
+    return pd.DataFrame({
+        'keyword': list(trends) + list(reddit),
+        'source': ['Google Trends'] * len(trends) + ['Reddit'] * len(reddit),
+        'rank': list(range(1, len(trends) + 1)) + list(range(1, len(reddit) + 1)),
+        'type': ['keyword'] * len(trends) + ['post_title'] * len(reddit),
+    })
+
+
+def scores(trend_scores, now):
+    top = trend_scores.top(10, now=now)
+    return dict(zip(top['keyword'], top['score']))
+
+
+def test_applied_snapshot_is_skipped_before_any_row_work(monkeypatch):
+    trend_scores = TrendScores()
+    assert trend_scores.update(snapshot(['a'], ['x']), 1000)
+
+    def fail(aggregated):
+        raise AssertionError('positions computed for an applied snapshot')
+    monkeypatch.setattr(scoring, 'positions', fail)
+
+    assert not trend_scores.update(snapshot(['a'], ['x']), 1000.4)
+
+
+def test_only_changed_sources_add_to_the_scores():
+    trend_scores = TrendScores()
+    trend_scores.update(snapshot(['a', 'b'], ['x']), 1000)
+    before = scores(trend_scores, 1000)
+
+    trend_scores.update(snapshot(['a', 'b'], ['y']), 2000)
+    after = scores(trend_scores, 1000)
+
+    assert after['a'] == pytest.approx(before['a'])
+    assert after['x'] == pytest.approx(before['x'])
+    assert 'y' in after
+
+
+def test_unchanged_snapshot_scores_nothing():
+    trend_scores = TrendScores()
+    trend_scores.update(snapshot(['a'], ['x']), 1000)
+
+    assert not trend_scores.update(snapshot(['a'], ['x']), 2000)
+
+
+def test_scores_decay_with_age():
+    trend_scores = TrendScores(half_life=100)
+    trend_scores.update(snapshot(['a'], []), 1000)
+
+    assert scores(trend_scores, 1100)['a'] == pytest.approx(scores(trend_scores, 1000)['a'] / 2)
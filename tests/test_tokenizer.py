@@ -0,0 +1,41 @@
+"""Keyword tokenizer: single texts, streams, Series and n-gram phrases."""
+
+import pandas as pd
+
+from tokenizer import Tokenizer, extract_keywords, extract_keywords_from_series, iter_keywords
+
+TITLES = ['Show HN: Rust compiler in the browser', 'The state of the art in Python tooling', None]
+
+
+def test_tokenize_drops_stop_words_and_short_words():
+    assert Tokenizer().tokenize('The Rust compiler is in a browser') == ['rust', 'compiler', 'browser']
+
+
+def test_extra_stop_words():
+    assert Tokenizer(extra_stop_words=['Rust']).tokenize('Rust compiler') == ['compiler']
+
+
+def test_series_matches_streaming():
+    words = extract_keywords_from_series(pd.Series(TITLES))
+
+    assert isinstance(words, pd.Series)
+    assert words.tolist() == list(iter_keywords(TITLES))
+    assert words.tolist() == [word for title in TITLES for word in extract_keywords(title)]
+
+
+def test_bigrams_follow_the_unigrams():
+    tokenizer = Tokenizer(ngrams=2)
+
+    assert tokenizer.tokenize('Rust compiler in the browser') == ['rust', 'compiler', 'browser', 'rust compiler']
+
+
+def test_phrases_never_span_stop_words():
+    phrases = [token for token in Tokenizer(ngrams=3).tokenize('state of the art python tooling') if ' ' in token]
+
+    assert phrases == ['art python', 'python tooling', 'art python tooling']
+
+
+def test_series_with_ngrams_matches_streaming():
+    tokenizer = Tokenizer(ngrams=2)
+
+    assert tokenizer.tokenize_series(pd.Series(TITLES)).tolist() == list(tokenizer.iter_tokens(TITLES))
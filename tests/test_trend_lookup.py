@@ -0,0 +1,88 @@
+"""Batched keyword comparisons, run against a fake pytrends session."""
+
+import pandas as pd
+import pytest
+
+import trend_lookup
+import trends_batching
+from trends_client import AdaptiveTokenBucket, TrendsClient
+
+REGIONS = ['Canada', 'India', 'United States']
+
+
+class FakeTrendReq:
+    """Serves interest scaled per payload, the way Google does"""
+
+    def __init__(self, levels, regional):
+        self.levels = levels  # keyword -> absolute interest
+        self.regional = regional  # keyword -> absolute interest per region
+        self.payloads = []
+
+    def build_payload(self, kw_list, **kwargs):
+        self.payloads.append(list(kw_list))
+
+    def _scaled(self, values):
+        frame = pd.DataFrame(values)
+        peak = frame.max().max()
+        return frame * (100.0 / peak) if peak > 0 else frame
+
+    def interest_over_time(self):
+        index = pd.date_range('2026-01-01', periods=4, freq='h')
+        frame = self._scaled({keyword: [self.levels[keyword]] * len(index) for keyword in self.payloads[-1]})
+        frame.index = index
+        frame['isPartial'] = False
+        return frame
+
+    def related_queries(self):
+        return {}
+
+    def interest_by_region(self, resolution='COUNTRY'):
+        frame = self._scaled({keyword: self.regional[keyword] for keyword in self.payloads[-1]})
+        frame.index = REGIONS
+        return frame
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    keywords = ['zzz', 'b', 'c', 'd', 'e', 'f', 'g']
+    levels = {'zzz': 0, 'b': 10, 'c': 20, 'd': 40, 'e': 5, 'f': 80, 'g': 30}
+    regional = {keyword: [level, level * 2, level * 3] for keyword, level in levels.items()}
+    pytrends = FakeTrendReq(levels, regional)
+    client = TrendsClient(limiter=AdaptiveTokenBucket(1000, 1000), sleep=lambda seconds: None)
+    client.session = lambda **kwargs: pytrends
+    monkeypatch.setattr(trend_lookup, 'trends_client', client)
+    monkeypatch.setattr(trends_batching, 'trends_client', client)
+    return keywords, levels, pytrends
+
+
+def test_comparison_led_by_a_zero_interest_keyword_keeps_every_keyword(fake):
+    keywords, levels, pytrends = fake
+
+    result = trend_lookup.fetch_keyword_comparison(keywords, 'now 7-d')
+
+    # The second payload is re-anchored on the first payload's strongest term
+    assert pytrends.payloads[1][0] == 'd'
+    assert set(result['interest'].columns) == set(keywords)
+    assert set(result['regional'].columns) == set(keywords)
+
+
+def test_regional_interest_is_aligned_across_payloads(fake):
+    keywords, levels, _ = fake
+
+    regional = trend_lookup.fetch_keyword_comparison(keywords, 'now 7-d')['regional']
+
+    assert regional.max().max() == pytest.approx(100)
+    # Same proportions as the absolute interest, whichever payload a keyword came from
+    for keyword in ['b', 'c', 'e', 'f', 'g']:
+        assert regional.loc['United States', keyword] / regional.loc['United States', 'd'] == pytest.approx(
+            levels[keyword] / levels['d'])
+
+
+def test_interest_is_aligned_across_payloads(fake):
+    keywords, levels, _ = fake
+
+    interest = trend_lookup.fetch_keyword_comparison(keywords, 'now 7-d')['interest']
+
+    means = interest.mean()
+    assert means['zzz'] == 0
+    assert means['f'] / means['d'] == pytest.approx(levels['f'] / levels['d'])
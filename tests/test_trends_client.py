@@ -0,0 +1,184 @@
+"""Throttle handling of the shared Google Trends client, on a fake clock."""
+
+import time
+
+import pytest
+import requests
+from pytrends.exceptions import ResponseError
+
+import trends_client
+from trends_client import AdaptiveTokenBucket, CircuitBreaker, TrendsClient, TrendsUnavailable
+
+
+class FakeClock:
+    """monotonic() and time() that only move when the client sleeps"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(time, 'monotonic', clock.monotonic)
+    return clock
+
+
+@pytest.fixture
+def client(clock):
+    return TrendsClient(limiter=AdaptiveTokenBucket(100, 100), sleep=clock.sleep)
+
+
+def response(status, headers=None, text=''):
+    result = requests.Response()
+    result.status_code = status
+    result.headers.update(headers or {})
+    result._content = text.encode()
+    return result
+
+
+class Failing:
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        raise self.error() if callable(self.error) else self.error
+
+
+def throttled(retry_after=None):
+    return lambda: ResponseError.from_response(response(429, {'Retry-After': retry_after} if retry_after else {}))
+
+
+def test_repeated_429s_open_the_breaker(client):
+    failing = Failing(throttled())
+
+    with pytest.raises(TrendsUnavailable) as unavailable:
+        client.call(failing)
+
+    assert client.breaker.state == 'open'
+    assert failing.calls == trends_client.BREAKER_THRESHOLD
+    assert unavailable.value.retry_in == pytest.approx(trends_client.BREAKER_COOLDOWN)
+    assert client.limiter.rate < client.limiter.max_rate
+
+
+def test_open_breaker_fails_fast_without_calling(client):
+    with pytest.raises(TrendsUnavailable):
+        client.call(Failing(throttled()))
+    failing = Failing(throttled())
+
+    with pytest.raises(TrendsUnavailable):
+        client.call(failing)
+    assert failing.calls == 0
+
+
+@pytest.mark.parametrize('error', [
+    lambda: requests.ConnectionError('Name or service not known'),
+    lambda: requests.Timeout('timed out'),
+    lambda: requests.HTTPError(response=response(503)),
+])
+def test_connection_and_server_errors_do_not_open_the_breaker(client, error):
+    for _ in range(5):
+        with pytest.raises(requests.RequestException):
+            client.call(Failing(error))
+
+    assert client.breaker.state == 'closed'
+    assert client.breaker.failures == 0
+    assert client.throttled_count == 0
+
+
+def test_google_rejecting_the_request_is_raised_as_is(client):
+    failing = Failing(lambda: ResponseError.from_response(response(400)))
+
+    with pytest.raises(ResponseError):
+        client.call(failing)
+    assert failing.calls == 1
+    assert client.breaker.state == 'closed'
+
+
+def test_half_open_probe_is_released_after_a_connection_error(clock):
+    breaker = CircuitBreaker(threshold=1, cooldown=10)
+    client = TrendsClient(limiter=AdaptiveTokenBucket(100, 100), breaker=breaker, sleep=clock.sleep)
+    breaker.record_failure()
+    clock.now += 11
+
+    with pytest.raises(requests.ConnectionError):
+        client.call(Failing(lambda: requests.ConnectionError('down')))
+
+    # Inconclusive probe: the next call may probe again, and a success closes the circuit
+    assert breaker.retry_in() == 0
+    assert client.call(lambda: 'ok') == 'ok'
+    assert breaker.state == 'closed'
+
+
+def test_failed_half_open_probe_doubles_the_cooldown(clock):
+    breaker = CircuitBreaker(threshold=1, cooldown=10)
+    client = TrendsClient(limiter=AdaptiveTokenBucket(100, 100), breaker=breaker, sleep=clock.sleep)
+    breaker.record_failure()
+    clock.now += 11
+
+    with pytest.raises(TrendsUnavailable):
+        client.call(Failing(throttled()))
+    assert breaker.state == 'open'
+    assert breaker.retry_in() == pytest.approx(20)
+
+
+def test_retry_after_above_max_wait_trips_the_breaker_without_sleeping(client, clock):
+    failing = Failing(throttled('600'))
+
+    with pytest.raises(TrendsUnavailable) as unavailable:
+        client.call(failing)
+
+    assert failing.calls == 1
+    assert clock.sleeps == []
+    assert unavailable.value.retry_in == pytest.approx(600)
+
+
+def test_short_retry_after_is_honoured(client, clock):
+    results = [throttled('2')(), 'ok']
+
+    def flaky():
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    assert client.call(flaky) == 'ok'
+    # The jittered backoff is shorter than what Retry-After asks for
+    assert clock.sleeps == [2.0]
+
+
+def test_token_wait_gives_up_once_the_breaker_opens(clock):
+    client = TrendsClient(limiter=AdaptiveTokenBucket(0.01, 1), sleep=clock.sleep)
+    assert client.call(lambda: 'first') == 'first'
+    # The next token is 100s away; the circuit opens while waiting for it
+    original_sleep = client._sleep
+
+    def sleep(seconds):
+        client.breaker.trip(300)
+        original_sleep(seconds)
+    client._sleep = sleep
+    called = []
+
+    with pytest.raises(TrendsUnavailable):
+        client.call(lambda: called.append(True))
+    assert called == []
+    assert len(clock.sleeps) == 1
+
+
+def test_token_wait_uses_the_injected_sleep(clock):
+    client = TrendsClient(limiter=AdaptiveTokenBucket(1, 1), sleep=clock.sleep)
+    client.call(lambda: None)
+
+    client.call(lambda: None)
+
+    assert sum(clock.sleeps) == pytest.approx(1, abs=trends_client.TOKEN_POLL_SECONDS)
@@ -0,0 +1,61 @@
+"""Per-region Google Trends snapshots and their merge."""
+
+import pandas as pd
+import pytest
+
+from disk_cache import DiskCache
+from trends_regions import REGION_CACHE_KEY, load_region, merge_regions
+
+
+def trending(*keywords):
+    return pd.DataFrame({'keyword': list(keywords), 'rank': range(1, len(keywords) + 1)})
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DiskCache(str(tmp_path / 'cache.sqlite'))
+
+
+class Fetcher:
+    def __init__(self, result):
+        self.result = result
+        self.regions = []
+
+    def __call__(self, region):
+        self.regions.append(region)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def test_fresh_region_is_not_refetched(cache):
+    cache.put(REGION_CACHE_KEY, trending('old'), 'region:canada')
+    fetch = Fetcher(trending('new'))
+
+    assert load_region('canada', fetch, cache)['keyword'].tolist() == ['old']
+    assert fetch.regions == []
+
+
+def test_invalidated_region_is_refetched(cache):
+    cache.put(REGION_CACHE_KEY, trending('old'), 'region:canada')
+    cache.invalidate(REGION_CACHE_KEY)
+    fetch = Fetcher(trending('new'))
+
+    assert load_region('canada', fetch, cache)['keyword'].tolist() == ['new']
+    assert fetch.regions == ['canada']
+
+
+@pytest.mark.parametrize('failure', [trending(), ConnectionError('down')])
+def test_invalidated_region_keeps_its_snapshot_when_the_refetch_fails(cache, failure):
+    cache.put(REGION_CACHE_KEY, trending('old'), 'region:canada')
+    cache.invalidate(REGION_CACHE_KEY)
+
+    assert load_region('canada', Fetcher(failure), cache)['keyword'].tolist() == ['old']
+
+
+def test_keywords_trending_in_more_regions_rank_first():
+    merged = merge_regions({'canada': trending('Alpha', 'Beta'), 'india': trending('beta', 'Gamma')})
+
+    # Spellings that differ in case are one keyword, named after its best-ranked row
+    assert merged.loc[merged['rank'] == 1, 'keyword'].unique().tolist() == ['beta']
+    assert merged.loc[merged['keyword'] == 'beta', 'regions'].tolist() == [2, 2]
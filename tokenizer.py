@@ -0,0 +1,90 @@
+"""
+Keyword tokenizer shared by the Streamlit app, the demo and batch jobs.
+
+Words are 3+ ASCII letters, lowercased, with stop words removed. Optional
+n-gram phrases are built from runs of adjacent kept words, so a phrase never
+spans a stop word ("state of the art" yields no "state art").
+"""
+
+import re
+
+import pandas as pd
+
+WORD_PATTERN = re.compile(r'\b[a-zA-Z]{2,}\b')
+
+DEFAULT_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did',
+    'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can',
+    'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they',
+    'me', 'him', 'her', 'us', 'them'
+})
+
+MIN_WORD_LENGTH = 3
+
+
+class Tokenizer:
+    """Precompiled keyword tokenizer with a frozen, configurable stop list"""
+
+    def __init__(self, stop_words=DEFAULT_STOP_WORDS, extra_stop_words=(), min_length=MIN_WORD_LENGTH, ngrams=1):
+        self.stop_words = frozenset(stop_words) | frozenset(w.lower() for w in extra_stop_words)
+        self.min_length = min_length
+        self.ngrams = ngrams
+
+    def _keep(self, word):
+        return len(word) >= self.min_length and word not in self.stop_words
+
+    def tokenize(self, text):
+        """Keywords in a single text, followed by its n-gram phrases if enabled"""
+        # Missing titles would otherwise become the words 'none' and 'nan'
+        if not isinstance(text, str) and pd.api.types.is_scalar(text) and pd.isna(text):
+            return []
+        words = WORD_PATTERN.findall(str(text).lower())
+        keywords = [word for word in words if self._keep(word)]
+        if self.ngrams > 1:
+            keywords.extend(self._phrases(words))
+        return keywords
+
+    def _phrases(self, words):
+        phrases = []
+        run = []
+        for word in words + ['']:  # Sentinel flushes the last run
+            if word and self._keep(word):
+                run.append(word)
+                continue
+            for n in range(2, self.ngrams + 1):
+                phrases.extend(' '.join(run[i:i + n]) for i in range(len(run) - n + 1))
+            run = []
+        return phrases
+
+    def iter_tokens(self, texts):
+        """Stream the keywords of every text in an iterable, one text at a time"""
+        for text in texts:
+            yield from self.tokenize(text)
+
+    def tokenize_series(self, texts):
+        """Keywords of every text in a Series as one flat Series, in order"""
+        texts = pd.Series(texts, dtype=object).dropna()
+        if self.ngrams > 1:
+            return texts.map(self.tokenize).explode().dropna().astype(str)
+        # Unigrams only: stay in vectorized string operations
+        words = texts.astype(str).str.lower().str.findall(WORD_PATTERN).explode().dropna().astype(str)
+        return words[~words.isin(self.stop_words) & (words.str.len() >= self.min_length)]
+
+
+default_tokenizer = Tokenizer()
+
+
+def extract_keywords(text):
+    """Extract keywords from a single text with the default tokenizer"""
+    return default_tokenizer.tokenize(text)
+
+
+def iter_keywords(texts):
+    """Stream keywords from an iterable of texts with the default tokenizer"""
+    return default_tokenizer.iter_tokens(texts)
+
+
+def extract_keywords_from_series(texts):
+    """Extract keywords from a Series of texts with the default tokenizer"""
+    return default_tokenizer.tokenize_series(texts)
@@ -0,0 +1,173 @@
+"""
+Cached Google Trends lookups for the Keyword Search tab.
+
+A lookup fetches interest over time, related queries and regional interest
+for one (keyword, timeframe, geo) in a single pytrends session. Results are
+kept in a process-wide TTL/LRU cache, and concurrent identical lookups from
+different sessions are merged so only one of them reaches Google. Every
+request goes through the shared TrendsClient, so a throttled Google fails
+the lookup fast with TrendsUnavailable.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from trends_batching import MAX_TERMS_PER_PAYLOAD, fetch_batched_interest, normalize_batches
+from trends_client import TrendsUnavailable, trends_client
+
+LOOKUP_TTL_SECONDS = 3600
+LOOKUP_MAX_ENTRIES = 256
+
+
+class TrendLookupCache:
+    """Thread-safe TTL + LRU cache that merges concurrent requests for the same key"""
+
+    def __init__(self, max_entries=LOOKUP_MAX_ENTRIES, ttl=LOOKUP_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (stored_at, value), least recently used first
+        self._inflight = {}  # key -> Future of the request currently fetching it
+        self._lock = threading.Lock()
+
+    def get(self, key, fetch):
+        """Return the cached value for key, calling fetch() at most once across threads on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                return entry[1]
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not owner:
+            # Someone else is already fetching this key; share their result
+            return future.result()
+
+        try:
+            value = fetch()
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            with self._lock:
+                self._entries[key] = (time.monotonic(), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def fetch_keyword_trend(keyword, timeframe, geo='US'):
+    """Fetch interest over time, related queries and regional interest for one keyword
+
+    Returns a dict with 'interest' (DataFrame), 'related' (DataFrame or None)
+    and 'regional' (Series or None). Errors building the payload or fetching
+    interest are raised; the two secondary lookups degrade to None, and are
+    skipped once Google starts throttling.
+    """
+    pytrends = trends_client.session(timeout=(10, 25))
+    trends_client.call(pytrends.build_payload, [keyword], cat=0, timeframe=timeframe, geo=geo, gprop='')
+    interest = trends_client.call(pytrends.interest_over_time)
+
+    result = {'interest': interest, 'related': None, 'regional': None}
+    if interest.empty or keyword not in interest.columns:
+        return result
+
+    try:
+        related_queries = trends_client.call(pytrends.related_queries)
+        top = related_queries.get(keyword, {}).get('top')
+        if top is not None and not top.empty:
+            result['related'] = top
+    except TrendsUnavailable:
+        return result
+    except Exception:
+        pass
+
+    try:
+        regional_interest = trends_client.call(pytrends.interest_by_region, resolution='COUNTRY')
+        if not regional_interest.empty and keyword in regional_interest.columns:
+            result['regional'] = regional_interest[keyword]
+    except Exception:
+        pass
+
+    return result
+
+
+def fetch_keyword_comparison(keywords, timeframe, geo='US'):
+    """Compare several keywords with as few Trends payloads as possible
+
+    Keywords are packed into 5-term payloads anchored on the first keyword,
+    or on the strongest term of the first payload if it has no interest
+    (see trends_batching), and related queries and regional interest are
+    fetched against each loaded payload, so every 4 extra keywords cost one
+    round-trip set. Returns a dict with 'interest' (one aligned, normalized
+    column per keyword), 'related' (keyword -> top related queries) and
+    'regional' (regions x keywords, normalized the same way as interest).
+    """
+    pytrends = trends_client.session(timeout=(10, 25))
+    related = {}
+    regional_batches = []
+    # The payloads are re-anchored if the first keyword has no interest; align regions on the same term
+    anchors = [keywords[0]]
+
+    def fetch_batch_details(pytrends, batch_keywords, anchor):
+        try:
+            related_queries = trends_client.call(pytrends.related_queries)
+            for keyword in batch_keywords:
+                top = related_queries.get(keyword, {}).get('top')
+                if top is not None and not top.empty:
+                    related[keyword] = top
+        except TrendsUnavailable:
+            raise
+        except Exception:
+            pass
+
+        regional_interest = trends_client.call(pytrends.interest_by_region, resolution='COUNTRY')
+        if not regional_interest.empty and anchor in regional_interest.columns:
+            regional_batches.append(regional_interest.astype(float))
+            anchors.append(anchor)
+
+    interest = fetch_batched_interest(
+        pytrends, keywords, anchor=keywords[0], timeframe=timeframe, geo=geo,
+        on_batch=fetch_batch_details
+    )
+    return {
+        'interest': interest,
+        'related': related,
+        'regional': normalize_batches(regional_batches, anchors[-1]),
+    }
+
+
+def payloads_needed(keyword_count):
+    """Number of Trends payloads a comparison of keyword_count keywords takes"""
+    if keyword_count <= 1:
+        return keyword_count
+    return -(-(keyword_count - 1) // (MAX_TERMS_PER_PAYLOAD - 1))
+
+
+# Shared by every session in this process
+trend_lookups = TrendLookupCache()
+
+
+def lookup_keyword_trend(keyword, timeframe, geo='US'):
+    """Cached, request-merging version of fetch_keyword_trend"""
+    return trend_lookups.get((keyword, timeframe, geo), lambda: fetch_keyword_trend(keyword, timeframe, geo))
+
+
+def lookup_keyword_comparison(keywords, timeframe, geo='US'):
+    """Cached, request-merging version of fetch_keyword_comparison"""
+    keywords = tuple(keywords)
+    return trend_lookups.get(('compare', keywords, timeframe, geo), lambda: fetch_keyword_comparison(list(keywords), timeframe, geo))
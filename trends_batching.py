@@ -0,0 +1,147 @@
+"""
+Batched Google Trends interest lookups.
+
+Google Trends accepts up to 5 terms per payload, but scales every payload to
+its own maximum, so values from different payloads are not comparable. This
+module packs keywords into 5-term payloads that all share one anchor term and
+rescales each batch by the anchor, producing a single comparable table.
+"""
+
+import pandas as pd
+
+from trends_client import TrendsUnavailable, trends_client
+
+MAX_TERMS_PER_PAYLOAD = 5
+
+
+def chunk_keywords(keywords, anchor, size=MAX_TERMS_PER_PAYLOAD):
+    """Split keywords into payloads of at most `size` terms, each including the anchor"""
+    seen = {anchor}
+    unique = []
+    for keyword in keywords:
+        if keyword not in seen:
+            seen.add(keyword)
+            unique.append(keyword)
+
+    if not unique:
+        return [[anchor]]
+    per_batch = size - 1
+    return [[anchor] + unique[i:i + per_batch] for i in range(0, len(unique), per_batch)]
+
+
+def pick_anchor(batches, preferred):
+    """Term to align batches on: the preferred anchor if it has interest, else the strongest shared term
+
+    Only terms present in every batch can align them. Returns None when no
+    shared term has any interest in the first batch.
+    """
+    shared = [column for column in batches[0].columns if all(column in batch.columns for batch in batches[1:])]
+    levels = batches[0][shared].mean()
+    if preferred in levels.index and levels[preferred] > 0:
+        return preferred
+    levels = levels[levels > 0]
+    return levels.idxmax() if not levels.empty else None
+
+
+def normalize_batches(batches, anchor):
+    """Rescale per-batch interest frames against the anchor and merge them into one table
+
+    Every batch is scaled so its anchor series matches the anchor of the first
+    batch, then the merged table is rescaled to Google's usual 0-100 range.
+    A single batch needs no alignment and is returned as it is. If the anchor
+    has no interest, the strongest term shared by all batches is used
+    instead; batches where that term has no interest cannot be aligned and
+    are dropped.
+    """
+    batches = [batch for batch in batches if not batch.empty]
+    if len(batches) <= 1:
+        return batches[0] if batches else pd.DataFrame()
+
+    anchor = pick_anchor(batches, anchor)
+    if anchor is None:
+        return batches[0]
+
+    reference = None
+    scaled = []
+    for batch in batches:
+        anchor_level = batch[anchor].mean()
+        if not anchor_level > 0:
+            continue
+        if reference is None:
+            reference = anchor_level
+            scaled.append(batch)
+        else:
+            scaled.append(batch.drop(columns=[anchor]) * (reference / anchor_level))
+
+    merged = pd.concat(scaled, axis=1)
+    peak = merged.max().max()
+    if peak > 0:
+        merged = merged * (100.0 / peak)
+    return merged
+
+
+def fetch_batched_interest(pytrends, keywords, anchor=None, timeframe='now 1-d', geo='', cat=0, client=None, on_batch=None):
+    """Fetch interest over time for any number of keywords using 5-term anchored payloads
+
+    Returns a frame indexed by date with one normalized column per keyword
+    (including the anchor). If the anchor has no interest in the first
+    payload, the remaining payloads are anchored on that payload's strongest
+    term instead. Batches that fail are skipped. Once Google is
+    throttling us the remaining batches are not tried, and TrendsUnavailable
+    is raised if no batch made it.
+    on_batch(pytrends, batch_keywords, anchor) is called while each
+    successful payload is still loaded, with the anchor that payload was
+    built around, so callers can make further requests against the same
+    payload and align them the same way.
+    """
+    keywords = list(keywords)
+    if not keywords:
+        return pd.DataFrame()
+    anchor = anchor or keywords[0]
+    client = client or trends_client
+
+    batches = []
+    pending = chunk_keywords(keywords, anchor)
+    while pending:
+        batch_keywords = pending.pop(0)
+        try:
+            # build_payload fetches the widget tokens, so it is a request of its own
+            client.call(pytrends.build_payload, batch_keywords, cat=cat, timeframe=timeframe, geo=geo)
+            interest = client.call(pytrends.interest_over_time)
+            if interest.empty or anchor not in interest.columns:
+                continue
+            interest = interest.drop(columns=['isPartial'], errors='ignore').astype(float)
+            batches.append(interest)
+            batch_anchor = anchor
+            if len(batches) == 1 and pending and not interest[anchor].mean() > 0:
+                # An anchor with no interest cannot align anything; re-anchor the rest
+                strongest = interest.mean().idxmax()
+                if interest[strongest].mean() > 0:
+                    remaining = [keyword for batch in pending for keyword in batch if keyword != anchor]
+                    anchor = strongest
+                    pending = chunk_keywords(remaining, anchor)
+        except TrendsUnavailable:
+            if not batches:
+                raise
+            break
+        except Exception:
+            continue
+
+        if on_batch:
+            try:
+                on_batch(pytrends, batch_keywords, batch_anchor)
+            except TrendsUnavailable:
+                break
+            except Exception:
+                pass
+
+    return normalize_batches(batches, anchor)
+
+
+def summarize_interest(interest):
+    """Average interest per keyword, highest first, dropping keywords with no interest"""
+    if interest.empty:
+        return pd.DataFrame(columns=['keyword', 'interest'])
+    averages = interest.mean()
+    averages = averages[averages > 0].sort_values(ascending=False)
+    return pd.DataFrame({'keyword': averages.index, 'interest': averages.values})
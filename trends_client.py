@@ -0,0 +1,273 @@
+"""
+Shared, throttle-aware access to Google Trends.
+
+Every pytrends request in NetTrends goes through one TrendsClient, which
+paces requests with a token bucket that slows down when Google answers 429
+and speeds back up as requests succeed, retries throttled and transient
+failures with exponential backoff and jitter (honouring Retry-After), and
+opens a circuit breaker after BREAKER_THRESHOLD throttled responses in a row
+(retries within one call count too). Only throttling (429 and quota pages)
+counts toward the breaker; connection errors and 5xx answers are
+retried and then raised as they are, since pausing would not help them. While the circuit is open
+calls fail immediately with TrendsUnavailable, so callers fall back to cached
+data instead of hammering a throttled endpoint; after a cooldown a single
+probe request decides whether to close it again.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from pytrends.exceptions import ResponseError
+from pytrends.request import TrendReq
+
+from http_client import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Request budget for Google Trends, overridable from the environment
+TRENDS_REQUESTS_PER_SECOND = float(os.environ.get('NETTRENDS_TRENDS_REQUESTS_PER_SECOND', '1'))
+TRENDS_BURST = int(os.environ.get('NETTRENDS_TRENDS_BURST', '2'))
+TRENDS_MIN_RATE = 0.05  # never slower than one request every 20 seconds
+
+MAX_RETRIES = 2
+BACKOFF_BASE = 1.0
+MAX_WAIT = 20.0  # longer waits are not slept through; the call fails instead
+
+BREAKER_THRESHOLD = 3  # consecutive throttled responses, retries included, that open the circuit
+BREAKER_COOLDOWN = 120.0
+BREAKER_MAX_COOLDOWN = 3600.0
+
+TRENDS_TIMEOUT = (5, 20)
+TOKEN_POLL_SECONDS = 0.1
+
+
+class TrendsUnavailable(Exception):
+    """Google Trends is throttling us; retry_in is the number of seconds until the next attempt"""
+
+    def __init__(self, message, retry_in=0.0):
+        super().__init__(message)
+        self.retry_in = retry_in
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """Token bucket that halves its rate when throttled and adds it back in steps as requests succeed"""
+
+    def __init__(self, rate, capacity, min_rate=TRENDS_MIN_RATE):
+        super().__init__(rate, capacity)
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self._slowed_at = None
+
+    def throttled(self):
+        with self._lock:
+            self._refill()
+            now = time.monotonic()
+            # Concurrent requests throttled together only count as one signal
+            if self._slowed_at is None or now - self._slowed_at >= 1 / self.rate:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self._slowed_at = now
+            self._tokens = min(self._tokens, 0)  # no burst straight after a 429
+
+    def succeeded(self):
+        with self._lock:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+
+class CircuitBreaker:
+    """Closed, open or half-open; opens after `threshold` consecutive failures"""
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN, max_cooldown=BREAKER_MAX_COOLDOWN):
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = 'closed'
+        self.failures = 0
+        self._cooldown = cooldown
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a request may go out now; in half-open state only one probe is let through"""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() >= self._open_until:
+                self.state = 'half_open'
+                return True
+            return False
+
+    def retry_in(self):
+        with self._lock:
+            if self.state == 'closed':
+                return 0.0
+            return max(0.0, self._open_until - time.monotonic())
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._cooldown = self.base_cooldown
+
+    def record_failure(self, retry_after=None):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open':
+                # The probe failed too: stay away for longer this time
+                self._cooldown = min(self.max_cooldown, self._cooldown * 2)
+            elif self.failures < self.threshold:
+                return
+            self.state = 'open'
+            self._open_until = time.monotonic() + max(self._cooldown, retry_after or 0)
+
+    def release(self):
+        """End a probe that told us nothing (e.g. a connection error) so the next call probes again"""
+        with self._lock:
+            if self.state == 'half_open':
+                self.state = 'open'
+                self._open_until = time.monotonic()
+
+    def trip(self, duration):
+        """Open the circuit for at least `duration` seconds, e.g. a long Retry-After"""
+        with self._lock:
+            self.state = 'open'
+            self._open_until = max(self._open_until, time.monotonic() + duration)
+
+
+def retry_after_seconds(response):
+    """Seconds a Retry-After header asks us to wait, or None"""
+    value = response.headers.get('Retry-After') if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(error):
+    """'throttled', 'transient' or None (Google answered; retrying will not help)"""
+    response = getattr(error, 'response', None)
+    if isinstance(error, (ResponseError, requests.HTTPError)) and response is not None:
+        if response.status_code == 429:
+            return 'throttled'
+        if response.status_code >= 500:
+            return 'transient'
+        # Quota pages are sometimes served as HTML with a 200
+        if 'quota limit' in (response.text or '').lower():
+            return 'throttled'
+        return None
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return 'transient'
+    return None
+
+
+class TrendsClient:
+    """Runs pytrends calls under a shared adaptive rate limit, backoff and circuit breaker"""
+
+    def __init__(self, limiter=None, breaker=None, max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE,
+                 max_wait=MAX_WAIT, sleep=time.sleep):
+        self.limiter = limiter or AdaptiveTokenBucket(TRENDS_REQUESTS_PER_SECOND, TRENDS_BURST)
+        self.breaker = breaker or CircuitBreaker()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_wait = max_wait
+        self.throttled_count = 0
+        self.last_throttled_at = None
+        self._sleep = sleep
+        self._random = random.Random()
+
+    def available(self):
+        """False while the circuit is open and no probe is due"""
+        return self.breaker.state == 'closed' or self.breaker.retry_in() == 0
+
+    def _unavailable(self, cause=None):
+        retry_in = self.breaker.retry_in()
+        error = TrendsUnavailable(f"Google Trends is rate limiting requests; retrying in {retry_in:.0f}s", retry_in)
+        error.__cause__ = cause
+        return error
+
+    def backoff(self, attempt, retry_after=None):
+        """Full-jitter exponential delay for a retry, at least what Retry-After asked for"""
+        delay = self._random.uniform(0, self.backoff_base * 2 ** attempt)
+        return max(delay, retry_after or 0)
+
+    def call(self, function, *args, **kwargs):
+        """Call function(*args, **kwargs), which makes one Trends request
+
+        Throttled (429) and transient (5xx, connection) failures are retried
+        with backoff. Raises TrendsUnavailable when the circuit is open or
+        Google keeps throttling; transient and any other errors are raised
+        as-is.
+        """
+        for attempt in range(self.max_retries + 1):
+            # Wait for a token in short steps, giving up as soon as the circuit opens
+            while not self.limiter.try_acquire():
+                if not self.available():
+                    raise self._unavailable()
+                self._sleep(TOKEN_POLL_SECONDS)
+            if not self.breaker.allow():
+                raise self._unavailable()
+            try:
+                result = function(*args, **kwargs)
+            except Exception as e:
+                kind = classify_error(e)
+                if kind is None:
+                    # Google answered, it just did not like the request
+                    self.breaker.record_success()
+                    raise
+                retry_after = retry_after_seconds(getattr(e, 'response', None))
+                if kind == 'throttled':
+                    self.throttled_count += 1
+                    self.last_throttled_at = time.time()
+                    self.limiter.throttled()
+                    self.breaker.record_failure(retry_after)
+                    if retry_after and retry_after > self.max_wait:
+                        self.breaker.trip(retry_after)
+                else:
+                    # Not throttling: retry, but leave the breaker to 429s
+                    self.breaker.release()
+                delay = self.backoff(attempt, retry_after)
+                if attempt == self.max_retries or delay > self.max_wait or self.breaker.state != 'closed':
+                    logger.warning(f"Google Trends request failed ({kind}): {e}")
+                    if kind == 'throttled':
+                        raise self._unavailable(e)
+                    raise
+                self._sleep(delay)
+            else:
+                self.limiter.succeeded()
+                self.breaker.record_success()
+                return result
+
+    def session(self, timeout=TRENDS_TIMEOUT, **kwargs):
+        """A new pytrends session; creating one fetches a cookie, so it counts as a request
+
+        pytrends' own retries are disabled, since they would bypass the
+        limiter and the breaker.
+        """
+        return self.call(TrendReq, hl='en-US', tz=360, timeout=timeout, retries=0, backoff_factor=0, **kwargs)
+
+    def quota_state(self):
+        """Snapshot of the throttling state, for display and logging"""
+        return {
+            'state': self.breaker.state,
+            'rate': self.limiter.rate,
+            'max_rate': self.limiter.max_rate,
+            'retry_in': self.breaker.retry_in(),
+            'consecutive_failures': self.breaker.failures,
+            'throttled': self.throttled_count,
+            'last_throttled_at': self.last_throttled_at,
+        }
+
+
+# Shared by every Trends caller in this process
+trends_client = TrendsClient()
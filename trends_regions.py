@@ -0,0 +1,133 @@
+"""
+Multi-region Google Trends collection.
+
+Trending searches are fetched for every configured region concurrently, all
+under the shared Trends client's rate budget, and merged into one frame with
+a region column. Keywords trending in several regions score higher: each
+region adds 1 / (RRF_K + the keyword's rank there), the same reciprocal-rank
+fusion the Overview uses across sources.
+
+Each region is cached on its own (a DiskCache window per region), so a
+refresh only refetches the regions whose snapshot expired, and a region that
+fails keeps serving its last snapshot.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from disk_cache import DiskCache
+from scoring import RRF_K
+from trends_client import trends_client
+
+logger = logging.getLogger(__name__)
+
+# pytrends region names (as used by trending_searches), overridable from the environment
+TRENDS_REGIONS = [
+    region.strip() for region in
+    os.environ.get('NETTRENDS_TRENDS_REGIONS', 'united_states,united_kingdom,canada,australia,india').split(',')
+    if region.strip()
+]
+REGION_TTL = int(os.environ.get('NETTRENDS_TRENDS_REGION_TTL', '3600'))
+MAX_REGION_WORKERS = 4
+
+# Region snapshots are stored under their own cache key, one window per region
+REGION_CACHE_KEY = 'google_trends_region'
+
+TRENDS_COLUMNS = ['keyword', 'source', 'rank', 'region', 'region_rank', 'regions', 'overlap_score']
+
+_region_cache = None
+
+
+def get_region_cache():
+    """Return the process-wide cache for region snapshots"""
+    global _region_cache
+    if _region_cache is None:
+        _region_cache = DiskCache()
+    return _region_cache
+
+
+def region_label(region):
+    return region.replace('_', ' ').title()
+
+
+def fetch_region(region, pytrends, client=None):
+    """Trending searches for one region, as a frame of keyword and rank"""
+    trending_searches = (client or trends_client).call(pytrends.trending_searches, pn=region)
+    keywords = trending_searches.iloc[:, 0].dropna().tolist() if len(trending_searches.columns) else []
+    return pd.DataFrame({'keyword': keywords, 'rank': range(1, len(keywords) + 1)})
+
+
+def load_region(region, fetch, cache, ttl=REGION_TTL):
+    """A region's snapshot from the cache while fresh, refetched once expired or invalidated
+
+    If the refetch fails or comes back empty, the old snapshot is used.
+    """
+    window = f'region:{region}'
+    entry = cache.get(REGION_CACHE_KEY, window)
+    if entry is not None and time.time() - entry[1] < ttl and not cache.is_stale(REGION_CACHE_KEY, window):
+        return entry[0]
+
+    try:
+        value = cache.refresh(REGION_CACHE_KEY, lambda: fetch(region), window)
+    except Exception as e:
+        logger.warning(f"Google Trends ({region_label(region)}) failed: {str(e)}")
+        value = None
+    if (value is None or len(value) == 0) and entry is not None:
+        return entry[0]
+    return value
+
+
+def merge_regions(frames):
+    """Merge {region: keyword/rank frame} into one frame, one row per keyword and region
+
+    Rows are ordered by overlap score; `rank` is the keyword's merged rank,
+    shared by its rows in every region, and `region_rank` its rank within the
+    region. Spellings that differ only in case are treated as one keyword.
+    """
+    parts = [
+        df[['keyword', 'rank']].assign(region=region_label(region))
+        for region, df in frames.items() if df is not None and not df.empty
+    ]
+    if not parts:
+        return pd.DataFrame(columns=TRENDS_COLUMNS)
+
+    merged = pd.concat(parts, ignore_index=True).rename(columns={'rank': 'region_rank'})
+    merged['keyword'] = merged['keyword'].astype(str)
+    match = merged['keyword'].str.casefold()
+    by_keyword = (1.0 / (RRF_K + merged['region_rank'])).groupby(match)
+    merged['overlap_score'] = by_keyword.transform('sum').round(5)
+    merged['regions'] = merged['region'].groupby(match).transform('nunique')
+    merged['best_rank'] = merged['region_rank'].groupby(match).transform('min')
+    merged['match'] = match
+
+    merged = merged.sort_values(['overlap_score', 'best_rank', 'match', 'region_rank'],
+                                ascending=[False, True, True, True], kind='stable')
+    merged['keyword'] = merged.groupby('match')['keyword'].transform('first')
+    merged['rank'] = pd.factorize(merged['match'])[0] + 1
+    merged['source'] = 'Google Trends'
+    return merged[TRENDS_COLUMNS].reset_index(drop=True)
+
+
+def fetch_trending_regions(regions=None, cache=None, ttl=REGION_TTL, client=None, max_workers=MAX_REGION_WORKERS):
+    """Trending searches of every region, fetched concurrently and merged (see merge_regions)"""
+    regions = list(regions or TRENDS_REGIONS)
+    cache = cache or get_region_cache()
+    client = client or trends_client
+    sessions = []
+    session_lock = threading.Lock()
+
+    def fetch(region):
+        # One pytrends session (and cookie request) shared by the regions that need fetching
+        with session_lock:
+            if not sessions:
+                sessions.append(client.session())
+        return fetch_region(region, sessions[0], client)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(regions)))) as executor:
+        frames = dict(zip(regions, executor.map(lambda region: load_region(region, fetch, cache, ttl), regions)))
+    return merge_regions(frames)